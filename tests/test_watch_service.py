@@ -0,0 +1,16 @@
+from tools.configs import path_define
+from tools.services import watch_service
+from tools.services.font_service import DesignContext
+
+
+def test_rebuild_common_glyph_with_one_width_mode(monkeypatch):
+    made_fonts = []
+    monkeypatch.setattr(DesignContext, 'make_font', lambda self, width_mode, language_flavor, font_formats: made_fonts.append((width_mode, language_flavor)))
+
+    design_context = DesignContext.load(10)
+    design_context._get_glyph_files('monospaced')
+    file_path = path_define.glyphs_dir.joinpath('10', 'common', '0080-00FF Latin-1 Supplement', '00A9.png')
+    watch_service.rebuild({10: design_context}, {file_path}, ['monospaced'], ['otf'], ['image'])
+
+    assert len(made_fonts) > 0
+    assert all(width_mode == 'monospaced' for width_mode, _ in made_fonts)
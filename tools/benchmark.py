@@ -0,0 +1,51 @@
+from pathlib import Path
+
+from cyclopts import App, Parameter
+from loguru import logger
+
+from tools import configs
+from tools.configs import path_define
+from tools.services import benchmark_service
+
+app = App(
+    version=configs.version,
+    default_parameter=Parameter(consume_multiple=True),
+)
+
+
+@app.default
+def main(
+        workloads: set[str] | None = None,
+        repeat: int = 5,
+        threshold: float = 0.2,
+        baseline: Path = path_define.benchmark_baseline_file_path,
+        save_baseline: bool = False,
+):
+    all_workloads = benchmark_service.create_workloads()
+    if workloads is None:
+        workloads = list(all_workloads)
+    else:
+        unknown_workloads = workloads - all_workloads.keys()
+        assert len(unknown_workloads) == 0, f'unknown workloads: {sorted(unknown_workloads)}'
+        workloads = [name for name in all_workloads if name in workloads]
+
+    logger.info('workloads = {}', workloads)
+    logger.info('repeat = {}', repeat)
+    logger.info('threshold = {}', threshold)
+    logger.info('baseline = {}', baseline)
+    logger.info('save_baseline = {}', save_baseline)
+
+    results = {name: benchmark_service.run_workload(name, all_workloads[name], repeat) for name in workloads}
+    benchmark_service.save_results(path_define.benchmarks_dir.joinpath('result.json'), results)
+
+    if save_baseline:
+        benchmark_service.save_results(baseline, results)
+    elif not baseline.is_file():
+        logger.warning("Benchmark baseline not found: '{}', run with --save-baseline first", baseline)
+    else:
+        regressions = benchmark_service.compare_with_baseline(results, threshold, baseline)
+        assert len(regressions) == 0, '\n'.join(regressions)
+
+
+if __name__ == '__main__':
+    app()
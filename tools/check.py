@@ -1,11 +1,29 @@
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+from cyclopts import App
+
+from tools import configs
 from tools.configs import options
 from tools.services import check_service
 
+app = App(version=configs.version)
+
+
+@app.default
+def main(jobs: int = 1):
+    tasks = [(check_service.check_glyphs, font_size, width_mode_dir_name) for font_size, width_mode_dir_name in itertools.product(options.font_sizes, itertools.chain(['common'], options.width_modes))]
+    tasks.extend((check_service.check_cross_directory_glyphs, font_size) for font_size in options.font_sizes)
+    if jobs == 1:
+        results = [check(*args) for check, *args in tasks]
+    else:
+        with ProcessPoolExecutor(jobs) as executor:
+            futures = [executor.submit(check, *args) for check, *args in tasks]
+            results = [future.result() for future in futures]
 
-def main():
-    for font_size in options.font_sizes:
-        check_service.check_glyphs(font_size)
+    errors = [error for result in results for error in result]
+    assert len(errors) == 0, '\n'.join(errors)
 
 
 if __name__ == '__main__':
-    main()
+    app()
@@ -1,20 +1,55 @@
+import functools
 import shutil
-from typing import Literal
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Literal, Any
 
 from cyclopts import App, Parameter
 from loguru import logger
 
 from tools import configs
 from tools.configs import path_define, options
-from tools.configs.options import FontSize, WidthMode, FontFormat, Attachment
-from tools.services import publish_service, info_service, template_service, image_service
+from tools.configs.options import FontSize, WidthMode, LanguageFlavor, FontFormat, Attachment
+from tools.services import info_service, template_service, image_service, profile_service, corpus_service
 from tools.services.font_service import DesignContext
+from tools.services.publish_service import ReleaseZipPacker
 
 app = App(
     version=configs.version,
     default_parameter=Parameter(consume_multiple=True),
 )
 
+_worker_design_contexts: dict[FontSize, DesignContext] = {}
+
+
+def _make_font(
+        font_size: FontSize,
+        width_mode: WidthMode,
+        language_flavor: LanguageFlavor,
+        font_formats: list[FontFormat],
+        return_font_datas: bool,
+        web_fonts: bool,
+        alphabet: set[str] | None,
+) -> tuple[dict[FontFormat, bytes] | None, list[dict[str, Any]]]:
+    with profile_service.measure('fonts', cprofile=True, font_size=font_size, width_mode=width_mode, language_flavor=language_flavor):
+        if font_size in _worker_design_contexts:
+            design_context = _worker_design_contexts[font_size]
+        else:
+            design_context = DesignContext.load(font_size)
+            _worker_design_contexts[font_size] = design_context
+        for other_design_context in _worker_design_contexts.values():
+            if other_design_context is not design_context:
+                other_design_context.release_glyphs()
+        font_datas = design_context.make_font(width_mode, language_flavor, font_formats, alphabet)
+        if web_fonts:
+            design_context.make_web_fonts(width_mode, language_flavor)
+    return font_datas if return_font_datas else None, profile_service.pop_records()
+
+
+def _pack_fonts_on_done(release_zip_packer: ReleaseZipPacker, language_flavor: LanguageFlavor, future: Future):
+    if future.exception() is None:
+        font_datas, _ = future.result()
+        release_zip_packer.add_fonts(language_flavor, font_datas)
+
 
 @app.default
 def main(
@@ -23,6 +58,10 @@ def main(
         width_modes: set[WidthMode] | None = None,
         font_formats: set[FontFormat] | None = None,
         attachments: set[Attachment | Literal['all']] | None = None,
+        corpus: list[str] | None = None,
+        jobs: int = 1,
+        profile: bool = False,
+        cprofile: bool = False,
 ):
     if font_sizes is None:
         font_sizes = options.font_sizes
@@ -33,7 +72,7 @@ def main(
     else:
         width_modes = sorted(width_modes, key=lambda x: options.width_modes.index(x))
     if font_formats is None:
-        font_formats = options.font_formats
+        font_formats = options.default_font_formats
     else:
         font_formats = sorted(font_formats, key=lambda x: options.font_formats.index(x))
     if attachments is None:
@@ -49,55 +88,129 @@ def main(
     logger.info('width_modes = {}', width_modes)
     logger.info('font_formats = {}', font_formats)
     logger.info('attachments = {}', attachments)
+    logger.info('corpus = {}', corpus)
+    logger.info('jobs = {}', jobs)
+    logger.info('profile = {}', profile)
+    logger.info('cprofile = {}', cprofile)
+
+    if profile or cprofile:
+        profile_service.enable(cprofile)
+
+    if cleanup:
+        for clean_dir in (path_define.outputs_dir, path_define.releases_dir):
+            if clean_dir.exists():
+                shutil.rmtree(clean_dir)
+                logger.info("Delete dir: '{}'", clean_dir)
+
+    if corpus is None:
+        alphabet = None
+    else:
+        alphabet = corpus_service.load_alphabet(corpus_service.get_corpus_file_paths(corpus))
+        logger.info('Corpus alphabet: {} characters', len(alphabet))
+        for attachment in ('release', 'image'):
+            if attachment in attachments:
+                logger.warning("Skip attachment for corpus build: '{}'", attachment)
+        attachments = [attachment for attachment in attachments if attachment not in ('release', 'image')]
 
-    if cleanup and path_define.build_dir.exists():
-        shutil.rmtree(path_define.build_dir)
-        logger.info("Delete dir: '{}'", path_define.build_dir)
+    executor = ProcessPoolExecutor(jobs, initializer=functools.partial(profile_service.enable, profile_service.is_cprofile_enabled()) if profile_service.is_enabled() else None) if jobs > 1 else None
+    font_futures = []
+    release_zip_packers = []
 
     design_contexts = {}
     for font_size in font_sizes:
-        design_context = DesignContext.load(font_size)
+        with profile_service.measure('load', cprofile=True, font_size=font_size):
+            design_context = DesignContext.load(font_size)
         design_contexts[font_size] = design_context
 
         for width_mode in width_modes:
-            design_context.make_fonts(width_mode, font_formats)
-
-    if 'release' in attachments:
-        for font_size in font_sizes:
-            for width_mode in width_modes:
-                publish_service.make_release_zips(font_size, width_mode, font_formats)
+            if alphabet is not None:
+                missing_chars = corpus_service.get_missing_chars(alphabet, design_context.get_alphabet(width_mode))
+                if len(missing_chars) > 0:
+                    logger.warning("Missing glyphs in corpus: {}px {} ({} characters): '{}'", font_size, width_mode, len(missing_chars), ''.join(missing_chars))
+
+            if 'release' in attachments and len(font_formats) > 0:
+                release_zip_packer = ReleaseZipPacker(font_size, width_mode, font_formats)
+                release_zip_packers.append(release_zip_packer)
+            else:
+                release_zip_packer = None
+
+            if executor is None:
+                with profile_service.measure('fonts', cprofile=True, font_size=font_size, width_mode=width_mode):
+                    design_context.make_fonts(width_mode, font_formats, release_zip_packer, 'html' in attachments, alphabet)
+            elif len(font_formats) > 0 or 'html' in attachments:
+                for language_flavor in options.language_flavors:
+                    future = executor.submit(_make_font, font_size, width_mode, language_flavor, font_formats, release_zip_packer is not None, 'html' in attachments, alphabet)
+                    if release_zip_packer is not None:
+                        future.add_done_callback(functools.partial(_pack_fonts_on_done, release_zip_packer, language_flavor))
+                    font_futures.append(future)
 
     if 'info' in attachments:
-        for font_size in font_sizes:
-            design_context = design_contexts[font_size]
-            for width_mode in width_modes:
-                info_service.make_info(design_context, width_mode)
+        with profile_service.measure('info', cprofile=True):
+            for font_size in font_sizes:
+                design_context = design_contexts[font_size]
+                for width_mode in width_modes:
+                    info_service.make_info(design_context, width_mode)
 
     if 'alphabet' in attachments:
-        for font_size in font_sizes:
-            design_context = design_contexts[font_size]
-            for width_mode in width_modes:
-                info_service.make_alphabet_txt(design_context, width_mode)
+        with profile_service.measure('alphabet', cprofile=True):
+            for font_size in font_sizes:
+                design_context = design_contexts[font_size]
+                for width_mode in width_modes:
+                    info_service.make_alphabet_txt(design_context, width_mode)
+
+    if 'bundle' in attachments:
+        with profile_service.measure('bundle', cprofile=True):
+            for font_size in font_sizes:
+                design_context = design_contexts[font_size]
+                for width_mode in width_modes:
+                    design_context.make_glyph_bundle(width_mode)
+                design_context.release_glyphs()
 
     if 'html' in attachments:
-        for font_size in font_sizes:
-            design_context = design_contexts[font_size]
-            for width_mode in width_modes:
-                template_service.make_alphabet_html(design_context, width_mode)
-            template_service.make_demo_html(design_context)
-        if all_font_sizes:
-            template_service.make_index_html()
-            template_service.make_playground_html()
+        with profile_service.measure('html', cprofile=True):
+            for design_context in design_contexts.values():
+                for width_mode in options.width_modes:
+                    design_context.get_alphabet(width_mode)
+            with ThreadPoolExecutor() as html_executor:
+                html_futures = []
+                for font_size in font_sizes:
+                    design_context = design_contexts[font_size]
+                    for width_mode in width_modes:
+                        html_futures.append(html_executor.submit(template_service.make_alphabet_html, design_context, width_mode))
+                    html_futures.append(html_executor.submit(template_service.make_demo_html, design_context))
+                if all_font_sizes:
+                    html_futures.append(html_executor.submit(template_service.make_index_html))
+                    html_futures.append(html_executor.submit(template_service.make_playground_html))
+            for future in html_futures:
+                future.result()
 
     if 'image' in attachments:
-        for font_size in font_sizes:
-            image_service.make_preview_image(font_size)
-        if all_font_sizes:
-            image_service.make_readme_banner(design_contexts)
-            image_service.make_github_banner(design_contexts)
-            image_service.make_itch_io_banner(design_contexts)
-            image_service.make_itch_io_cover()
-            image_service.make_afdian_cover()
+        with profile_service.measure('image', cprofile=True):
+            wait(font_futures)
+            if all_font_sizes:
+                for design_context in design_contexts.values():
+                    design_context.get_alphabet('proportional')
+            with ThreadPoolExecutor() as image_executor:
+                image_futures = [image_executor.submit(image_service.make_preview_image, font_size) for font_size in font_sizes]
+                if all_font_sizes:
+                    image_futures.append(image_executor.submit(image_service.make_readme_banner, design_contexts))
+                    image_futures.append(image_executor.submit(image_service.make_github_banner, design_contexts))
+                    image_futures.append(image_executor.submit(image_service.make_itch_io_banner, design_contexts))
+                    image_futures.append(image_executor.submit(image_service.make_itch_io_cover))
+                    image_futures.append(image_executor.submit(image_service.make_afdian_cover))
+            for future in image_futures:
+                future.result()
+
+    with profile_service.measure('finish', cprofile=True):
+        for future in font_futures:
+            _, profile_records = future.result()
+            profile_service.add_records(profile_records)
+        for release_zip_packer in release_zip_packers:
+            release_zip_packer.close()
+        if executor is not None:
+            executor.shutdown()
+
+    profile_service.save_report()
 
 
 if __name__ == '__main__':
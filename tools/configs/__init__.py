@@ -2,18 +2,25 @@ from pixel_font_knife import glyph_mapping_util
 from pixel_font_knife.kerning_util import KerningConfig
 
 from tools.configs import path_define, options
+from tools.configs.code_point import CodePointTable
 from tools.configs.font import FontConfig
 
 version = '2026.08.11'
 
 font_configs = {font_size: FontConfig.load(font_size) for font_size in options.font_sizes}
 
-mappings = [
-    glyph_mapping_util.load_mapping(path_define.mappings_dir.joinpath('2E80-2EFF CJK Radicals Supplement.yaml')),
-    glyph_mapping_util.load_mapping(path_define.mappings_dir.joinpath('2F00-2FDF Kangxi Radicals.yaml')),
+code_point_table = CodePointTable.build()
+
+mapping_file_paths = [
+    path_define.mappings_dir.joinpath('2E80-2EFF CJK Radicals Supplement.yaml'),
+    path_define.mappings_dir.joinpath('2F00-2FDF Kangxi Radicals.yaml'),
 ]
 
-kerning_config = KerningConfig.load(path_define.kernings_dir.joinpath('default.yaml'))
+mappings = [glyph_mapping_util.load_mapping(file_path) for file_path in mapping_file_paths]
+
+kerning_config_file_path = path_define.kernings_dir.joinpath('default.yaml')
+
+kerning_config = KerningConfig.load(kerning_config_file_path)
 
 locale_to_language_flavor = {
     'en': 'latin',
@@ -0,0 +1,108 @@
+from array import array
+
+import unidata_blocks
+from unidata_blocks import UnicodeBlock
+
+_CODE_POINT_COUNT = 0x110000
+_NO_BLOCK = 0xFFFF
+
+_FLAG_VERTICAL_OFFSET_ADJUSTED = 0b0001
+_FLAG_DOUBLE_ADVANCE_HEIGHT = 0b0010
+_FLAG_TOP_ROW_BLANK_REQUIRED = 0b0100
+_FLAG_RIGHT_COLUMN_BLANK_REQUIRED = 0b1000
+
+_full_canvas_block_names = [
+    'Box Drawing',
+    'Block Elements',
+]
+
+_full_canvas_code_points = [
+    0x25D8, 0x25D9, 0x25DA, 0x25DB,
+    0x25E2, 0x25E3, 0x25E4, 0x25E5,
+    0x25F8, 0x25F9, 0x25FA, 0x25FF,
+]
+
+_vertical_offset_unadjusted_code_points = [
+    0x3031, 0x3032, 0x3033, 0x3034, 0x3035,
+]
+
+_double_advance_height_code_points = [
+    0x3031, 0x3032,
+]
+
+_top_row_unchecked_code_points = [
+    0x3035,
+]
+
+_right_column_unchecked_code_points = [
+    0x2013,
+    0x2015,
+    0x3030,
+]
+
+
+class CodePointTable:
+    @staticmethod
+    def build() -> CodePointTable:
+        blocks = unidata_blocks.get_blocks()
+        block_indexes = array('H', [_NO_BLOCK]) * _CODE_POINT_COUNT
+        flags = bytearray(_CODE_POINT_COUNT)
+
+        for block_index, block in enumerate(blocks):
+            size = block.code_end - block.code_start + 1
+            block_indexes[block.code_start:block.code_end + 1] = array('H', [block_index]) * size
+            if block.name not in _full_canvas_block_names:
+                flags[block.code_start:block.code_end + 1] = bytes([_FLAG_VERTICAL_OFFSET_ADJUSTED | _FLAG_TOP_ROW_BLANK_REQUIRED | _FLAG_RIGHT_COLUMN_BLANK_REQUIRED]) * size
+
+        for code_point in _full_canvas_code_points:
+            flags[code_point] &= ~(_FLAG_VERTICAL_OFFSET_ADJUSTED | _FLAG_TOP_ROW_BLANK_REQUIRED | _FLAG_RIGHT_COLUMN_BLANK_REQUIRED)
+        for code_point in _vertical_offset_unadjusted_code_points:
+            flags[code_point] &= ~_FLAG_VERTICAL_OFFSET_ADJUSTED
+        for code_point in _double_advance_height_code_points:
+            flags[code_point] |= _FLAG_DOUBLE_ADVANCE_HEIGHT
+        for code_point in _top_row_unchecked_code_points:
+            flags[code_point] &= ~_FLAG_TOP_ROW_BLANK_REQUIRED
+        for code_point in _right_column_unchecked_code_points:
+            flags[code_point] &= ~_FLAG_RIGHT_COLUMN_BLANK_REQUIRED
+
+        return CodePointTable(blocks, block_indexes, flags)
+
+    blocks: list[UnicodeBlock]
+    _block_indexes: array
+    _flags: bytearray
+
+    def __init__(
+            self,
+            blocks: list[UnicodeBlock],
+            block_indexes: array,
+            flags: bytearray,
+    ):
+        self.blocks = blocks
+        self._block_indexes = block_indexes
+        self._flags = flags
+
+    def get_block_index(self, code_point: int) -> int | None:
+        if code_point < 0:
+            return None
+        block_index = self._block_indexes[code_point]
+        return None if block_index == _NO_BLOCK else block_index
+
+    def get_block(self, code_point: int) -> UnicodeBlock | None:
+        block_index = self.get_block_index(code_point)
+        return None if block_index is None else self.blocks[block_index]
+
+    def get_vertical_offset_adjustment(self, code_point: int) -> int:
+        if code_point < 0:
+            return 0
+        return -1 if self._flags[code_point] & _FLAG_VERTICAL_OFFSET_ADJUSTED else 0
+
+    def get_advance_height_scale(self, code_point: int) -> int:
+        if code_point < 0:
+            return 1
+        return 2 if self._flags[code_point] & _FLAG_DOUBLE_ADVANCE_HEIGHT else 1
+
+    def is_top_row_blank_required(self, code_point: int) -> bool:
+        return code_point >= 0 and self._flags[code_point] & _FLAG_TOP_ROW_BLANK_REQUIRED != 0
+
+    def is_right_column_blank_required(self, code_point: int) -> bool:
+        return code_point >= 0 and self._flags[code_point] & _FLAG_RIGHT_COLUMN_BLANK_REQUIRED != 0
@@ -36,13 +36,17 @@ type FontFormat = Literal[
     'dfont',
     'bdf',
     'pcf',
+    'atlas.zip',
 ]
 font_formats = list[FontFormat](get_args(FontFormat.__value__))
+extra_font_formats = list[FontFormat](['atlas.zip'])
+default_font_formats = [font_format for font_format in font_formats if font_format not in extra_font_formats]
 
 type Attachment = Literal[
     'release',
     'info',
     'alphabet',
+    'bundle',
     'html',
     'image',
 ]
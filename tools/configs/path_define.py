@@ -12,6 +12,20 @@ images_dir = assets_dir.joinpath('images')
 
 build_dir = project_root_dir.joinpath('build')
 outputs_dir = build_dir.joinpath('outputs')
+web_fonts_dir = outputs_dir.joinpath('web-fonts')
 releases_dir = build_dir.joinpath('releases')
+subsets_dir = build_dir.joinpath('subsets')
+caches_dir = build_dir.joinpath('caches')
+glyph_caches_dir = caches_dir.joinpath('glyphs')
+font_manifests_dir = caches_dir.joinpath('manifests')
+subset_manifests_dir = caches_dir.joinpath('subsets')
+kerning_caches_dir = caches_dir.joinpath('kernings')
+format_manifests_dir = caches_dir.joinpath('formats')
+unicode_caches_dir = caches_dir.joinpath('unicode')
+template_caches_dir = caches_dir.joinpath('templates')
+profiles_dir = build_dir.joinpath('profiles')
+profile_parts_dir = profiles_dir.joinpath('parts')
+benchmarks_dir = build_dir.joinpath('benchmarks')
+benchmark_baseline_file_path = benchmarks_dir.joinpath('baseline.json')
 
 docs_dir = project_root_dir.joinpath('docs')
@@ -1,13 +1,28 @@
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+from cyclopts import App
+
+from tools import configs
 from tools.configs import options
 from tools.services import format_service
 
+app = App(version=configs.version)
+
 
-def main():
-    for font_size in options.font_sizes:
-        format_service.format_glyphs(font_size)
+@app.default
+def main(jobs: int = 1):
+    tasks = list(itertools.product(options.font_sizes, itertools.chain(['common'], options.width_modes)))
+    if jobs == 1:
+        for font_size, width_mode_dir_name in tasks:
+            format_service.format_glyphs(font_size, width_mode_dir_name)
+    else:
+        with ProcessPoolExecutor(jobs) as executor:
+            for _ in executor.map(format_service.format_glyphs, *zip(*tasks)):
+                pass
 
     format_service.format_mappings()
 
 
 if __name__ == '__main__':
-    main()
+    app()
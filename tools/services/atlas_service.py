@@ -0,0 +1,192 @@
+import json
+import math
+from io import BytesIO
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED, ZIP_STORED
+
+from PIL import Image
+from pixel_font_builder import FontBuilder, Glyph
+from pixel_font_builder.metric import LineMetric
+
+_atlas_max_page_size = 2048
+_atlas_padding = 1
+
+type _Rect = tuple[int, int, int, int]
+
+
+def _get_ink_box(glyph: Glyph) -> _Rect:
+    top = None
+    bottom = 0
+    left = glyph.width
+    right = 0
+    for y, bitmap_row in enumerate(glyph.bitmap):
+        if 1 not in bitmap_row:
+            continue
+        if top is None:
+            top = y
+        bottom = y + 1
+        left = min(left, bitmap_row.index(1))
+        right = max(right, len(bitmap_row) - bitmap_row[::-1].index(1))
+    if top is None:
+        return 0, 0, 0, 0
+    return left, top, right, bottom
+
+
+def _get_power_of_two(value: int) -> int:
+    return 1 << max(value - 1, 0).bit_length()
+
+
+def _find_skyline_position(skyline: list[list[int]], width: int, height: int, page_width: int, page_height: int) -> tuple[int, int, int] | None:
+    position = None
+    best_key = None
+    for index, (x, _, _) in enumerate(skyline):
+        if x + width > page_width:
+            break
+        y = 0
+        covered_width = 0
+        next_index = index
+        while covered_width < width:
+            y = max(y, skyline[next_index][1])
+            covered_width += skyline[next_index][2]
+            next_index += 1
+        if y + height > page_height:
+            continue
+        key = y + height, x
+        if best_key is None or key < best_key:
+            best_key = key
+            position = index, x, y
+    return position
+
+
+def _place_skyline_rect(skyline: list[list[int]], index: int, x: int, y: int, width: int, height: int):
+    skyline.insert(index, [x, y + height, width])
+    right = x + width
+    next_index = index + 1
+    while next_index < len(skyline) and skyline[next_index][0] < right:
+        segment = skyline[next_index]
+        if segment[0] + segment[2] <= right:
+            del skyline[next_index]
+        else:
+            segment[2] -= right - segment[0]
+            segment[0] = right
+            break
+
+    merged_skyline = [skyline[0]]
+    for segment in skyline[1:]:
+        if merged_skyline[-1][1] == segment[1]:
+            merged_skyline[-1][2] += segment[2]
+        else:
+            merged_skyline.append(segment)
+    skyline[:] = merged_skyline
+
+
+def _pack_page(sizes: dict[int, tuple[int, int]]) -> tuple[tuple[int, int], dict[int, tuple[int, int]]]:
+    area = sum(width * height for width, height in sizes.values())
+    max_width = max(width for width, _ in sizes.values())
+    page_width = min(max(_get_power_of_two(max_width), _get_power_of_two(math.isqrt(area - 1) + 1)), _atlas_max_page_size)
+    page_height = _atlas_max_page_size
+    skyline = [[0, 0, page_width]]
+    positions = {}
+    used_height = 0
+    for key, (width, height) in sorted(sizes.items(), key=lambda item: (-item[1][1], -item[1][0], item[0])):
+        position = _find_skyline_position(skyline, width, height, page_width, page_height)
+        if position is None:
+            continue
+        index, x, y = position
+        _place_skyline_rect(skyline, index, x, y, width, height)
+        positions[key] = x, y
+        used_height = max(used_height, y + height)
+    return (page_width, _get_power_of_two(used_height)), positions
+
+
+def _pack_rects(sizes: dict[int, tuple[int, int]]) -> list[tuple[tuple[int, int], dict[int, tuple[int, int]]]]:
+    pages = []
+    while len(sizes) > 0:
+        page_size, positions = _pack_page(sizes)
+        if len(positions) == 0:
+            raise ValueError(f'glyphs larger than atlas page: {_atlas_max_page_size}px')
+        pages.append((page_size, positions))
+        sizes = {key: size for key, size in sizes.items() if key not in positions}
+    return pages
+
+
+def _dump_line_metric(line_metric: LineMetric) -> dict[str, int]:
+    return {
+        'ascent': line_metric.ascent,
+        'descent': line_metric.descent,
+        'line_gap': line_metric.line_gap,
+    }
+
+
+def dump_atlas(builder: FontBuilder) -> bytes:
+    ink_boxes = [_get_ink_box(glyph) for glyph in builder.glyphs]
+    sizes = {}
+    for glyph_index, (left, top, right, bottom) in enumerate(ink_boxes):
+        if right > left:
+            sizes[glyph_index] = right - left + _atlas_padding, bottom - top + _atlas_padding
+    pages = _pack_rects(sizes)
+
+    glyph_index_to_page = {}
+    page_images = []
+    for page_index, ((page_width, page_height), positions) in enumerate(pages):
+        pixels = bytearray(page_width * page_height)
+        for glyph_index, (x, y) in positions.items():
+            left, top, right, bottom = ink_boxes[glyph_index]
+            for row_index, bitmap_row in enumerate(builder.glyphs[glyph_index].bitmap[top:bottom]):
+                start = (y + row_index) * page_width + x
+                pixels[start:start + right - left] = bytes(bitmap_row[left:right])
+            glyph_index_to_page[glyph_index] = page_index, x, y
+        page_images.append(Image.frombytes('L', (page_width, page_height), bytes(pixels)).point(lambda value: 0xFF if value != 0 else 0, '1'))
+
+    glyph_name_to_index = {}
+    glyph_infos = []
+    for glyph_index, glyph in enumerate(builder.glyphs):
+        glyph_name_to_index[glyph.name] = glyph_index
+        left, top, right, bottom = ink_boxes[glyph_index]
+        bottom_padding = glyph.height - bottom if right > left else 0
+        page_index, x, y = glyph_index_to_page.get(glyph_index, (0, 0, 0))
+        glyph_infos.append({
+            'name': glyph.name,
+            'page': page_index,
+            'x': x,
+            'y': y,
+            'width': right - left,
+            'height': bottom - top,
+            'horizontal_offset': [glyph.horizontal_offset_x + left, glyph.horizontal_offset_y + bottom_padding],
+            'advance_width': glyph.advance_width,
+            'vertical_offset': [glyph.vertical_offset_x + left, glyph.vertical_offset_y + top],
+            'advance_height': glyph.advance_height,
+        })
+
+    descriptor = {
+        'family_name': builder.meta_info.family_name,
+        'version': builder.meta_info.version,
+        'font_size': builder.font_metric.font_size,
+        'horizontal_layout': _dump_line_metric(builder.font_metric.horizontal_layout),
+        'vertical_layout': _dump_line_metric(builder.font_metric.vertical_layout),
+        'x_height': builder.font_metric.x_height,
+        'cap_height': builder.font_metric.cap_height,
+        'pages': [{
+            'file': f'atlas-{page_index}.png',
+            'width': page_image.width,
+            'height': page_image.height,
+        } for page_index, page_image in enumerate(page_images)],
+        'glyphs': glyph_infos,
+        'character_mapping': [[code_point, glyph_name_to_index[glyph_name]] for code_point, glyph_name in sorted(builder.character_mapping.items())],
+        'kerning_pairs': [[glyph_name_to_index[left_glyph_name], glyph_name_to_index[right_glyph_name], offset] for (left_glyph_name, right_glyph_name), offset in builder.kerning_values.items()],
+    }
+
+    date_time = builder.meta_info.modified_time.timetuple()[:6]
+    stream = BytesIO()
+    with ZipFile(stream, 'w') as zip_file:
+        zip_info = ZipInfo('atlas.json', date_time)
+        zip_info.compress_type = ZIP_DEFLATED
+        zip_info.external_attr = 0o100644 << 16
+        zip_file.writestr(zip_info, json.dumps(descriptor, ensure_ascii=False, separators=(',', ':')))
+        for page_index, page_image in enumerate(page_images):
+            page_stream = BytesIO()
+            page_image.save(page_stream, 'PNG', optimize=True)
+            zip_info = ZipInfo(f'atlas-{page_index}.png', date_time)
+            zip_info.compress_type = ZIP_STORED
+            zip_info.external_attr = 0o100644 << 16
+            zip_file.writestr(zip_info, page_stream.getvalue())
+    return stream.getvalue()
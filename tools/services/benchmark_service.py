@@ -0,0 +1,145 @@
+import functools
+import json
+import math
+import platform
+import statistics
+import time
+from collections.abc import Callable
+from importlib import metadata
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+from pixel_font_builder import FontBuilder
+
+from tools import configs
+from tools.configs import options
+from tools.configs.options import FontSize, LanguageFlavor, FontFormat
+from tools.services import glyph_cache_service, info_service, image_service
+from tools.services.font_service import DesignContext, dump_font
+
+type Prepare = Callable[[], Callable[[], object]]
+
+_font_size: FontSize = 12
+_image_language_flavors: list[LanguageFlavor] = ['latin', 'zh_cn', 'zh_tr', 'ja']
+
+
+@functools.cache
+def _get_design_context() -> DesignContext:
+    return DesignContext.load(_font_size)
+
+
+@functools.cache
+def _get_builder() -> FontBuilder:
+    return _get_design_context().create_builder('proportional', 'latin')
+
+
+@functools.cache
+def _make_image_fonts():
+    for language_flavor in _image_language_flavors:
+        _get_design_context().make_font('proportional', language_flavor, ['otf.woff2'])
+
+
+def _load_context():
+    for width_mode_dir_name in ('common', 'proportional'):
+        glyph_cache_service.load_packed_context(_font_size, width_mode_dir_name)
+
+
+def _prepare_create_builder() -> Callable[[], object]:
+    return functools.partial(_get_design_context().create_builder, 'proportional', 'latin')
+
+
+def _prepare_dump_font(font_format: FontFormat) -> Callable[[], object]:
+    return functools.partial(dump_font, _get_builder(), font_format)
+
+
+def _prepare_make_info() -> Callable[[], object]:
+    return functools.partial(info_service.make_info, _get_design_context(), 'proportional')
+
+
+def _prepare_image(make_image: Callable[..., object], *args: object) -> Callable[[], object]:
+    _make_image_fonts()
+    return functools.partial(make_image, *args)
+
+
+def _prepare_banner(make_banner: Callable[[dict[FontSize, DesignContext]], object]) -> Callable[[], object]:
+    _make_image_fonts()
+    return functools.partial(make_banner, {_font_size: _get_design_context()})
+
+
+def create_workloads() -> dict[str, Prepare]:
+    workloads = {
+        'load_context': lambda: _load_context,
+        'create_builder': _prepare_create_builder,
+    }
+    for font_format in options.font_formats:
+        workloads[f'dump_font[{font_format}]'] = functools.partial(_prepare_dump_font, font_format)
+    workloads['make_info'] = _prepare_make_info
+    workloads['make_preview_image'] = functools.partial(_prepare_image, image_service.make_preview_image, _font_size)
+    workloads['make_readme_banner'] = functools.partial(_prepare_banner, image_service.make_readme_banner)
+    workloads['make_github_banner'] = functools.partial(_prepare_banner, image_service.make_github_banner)
+    workloads['make_itch_io_banner'] = functools.partial(_prepare_banner, image_service.make_itch_io_banner)
+    workloads['make_itch_io_cover'] = functools.partial(_prepare_image, image_service.make_itch_io_cover)
+    workloads['make_afdian_cover'] = functools.partial(_prepare_image, image_service.make_afdian_cover)
+    return workloads
+
+
+def run_workload(name: str, prepare: Prepare, repeat: int) -> dict[str, Any]:
+    prepare()()
+
+    times = []
+    for _ in range(repeat):
+        run = prepare()
+        start_time = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start_time)
+    times.sort()
+
+    result = {
+        'median': statistics.median(times),
+        'p95': times[math.ceil(len(times) * 0.95) - 1],
+        'times': times,
+    }
+    logger.info("Benchmark '{}': median = {:.4f}s, p95 = {:.4f}s", name, result['median'], result['p95'])
+    return result
+
+
+def _get_environment() -> dict[str, str]:
+    return {
+        'version': configs.version,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pixel-font-builder': metadata.version('pixel-font-builder'),
+        'pixel-font-knife': metadata.version('pixel-font-knife'),
+        'fonttools': metadata.version('fonttools'),
+        'pillow': metadata.version('pillow'),
+    }
+
+
+def save_results(file_path: Path, results: dict[str, dict[str, Any]]):
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_text(json.dumps({
+        'environment': _get_environment(),
+        'results': results,
+    }, indent=2), 'utf-8')
+    logger.info("Make benchmark results: '{}'", file_path)
+
+
+def compare_with_baseline(results: dict[str, dict[str, Any]], threshold: float, file_path: Path) -> list[str]:
+    baseline = json.loads(file_path.read_bytes())
+
+    environment = _get_environment()
+    for key, value in baseline['environment'].items():
+        if environment.get(key) != value:
+            logger.info("Benchmark environment changed: {} = '{}' (baseline '{}')", key, environment.get(key), value)
+
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline['results']:
+            continue
+        baseline_median = baseline['results'][name]['median']
+        ratio = result['median'] / baseline_median
+        logger.info("Benchmark '{}': {:.4f}s -> {:.4f}s ({:+.1%})", name, baseline_median, result['median'], ratio - 1)
+        if ratio > 1 + threshold:
+            regressions.append(f"[{name}] median regressed {ratio - 1:+.1%}: {baseline_median:.4f}s -> {result['median']:.4f}s")
+    return regressions
@@ -0,0 +1,174 @@
+import bisect
+import mmap
+import struct
+from pathlib import Path
+
+from tools.configs import options
+from tools.configs.font import LayoutMetric
+from tools.configs.options import FontSize, WidthMode, LanguageFlavor
+from tools.services.glyph_cache_service import PackedBitmap
+
+_MAGIC = b'APFBUNDL'
+_VERSION = 1
+
+_header_struct = struct.Struct('<8sI16sHHIIII')
+_layout_metric_struct = struct.Struct('<7hxx')
+_table_struct = struct.Struct('<16sII')
+_glyph_struct = struct.Struct('<hhHhhHHH')
+
+_table_flavors: list[LanguageFlavor | None] = [None, *options.language_flavors]
+
+
+class BundleGlyph:
+    __slots__ = ('horizontal_offset', 'advance_width', 'vertical_offset', 'advance_height', 'bitmap')
+
+    horizontal_offset: tuple[int, int]
+    advance_width: int
+    vertical_offset: tuple[int, int]
+    advance_height: int
+    bitmap: PackedBitmap
+
+    def __init__(
+            self,
+            horizontal_offset: tuple[int, int],
+            advance_width: int,
+            vertical_offset: tuple[int, int],
+            advance_height: int,
+            bitmap: PackedBitmap,
+    ):
+        self.horizontal_offset = horizontal_offset
+        self.advance_width = advance_width
+        self.vertical_offset = vertical_offset
+        self.advance_height = advance_height
+        self.bitmap = bitmap
+
+
+def dump_glyph_bundle(
+        font_size: FontSize,
+        width_mode: WidthMode,
+        layout_metric: LayoutMetric,
+        glyphs: list[BundleGlyph],
+        tables: dict[LanguageFlavor | None, dict[int, int]],
+) -> bytes:
+    bitmap_stride = max((len(glyph.bitmap.data) for glyph in glyphs), default=0)
+    bitmap_stride += -bitmap_stride % 4
+    tables_offset = _header_struct.size + _layout_metric_struct.size
+    entries_offset = tables_offset + _table_struct.size * len(_table_flavors)
+    glyphs_offset = entries_offset + sum(len(tables.get(flavor, {})) * 8 for flavor in _table_flavors)
+    bitmaps_offset = glyphs_offset + _glyph_struct.size * len(glyphs)
+
+    data = bytearray(_header_struct.pack(_MAGIC, _VERSION, width_mode.encode(), font_size, bitmap_stride, len(glyphs), len(_table_flavors), glyphs_offset, bitmaps_offset))
+    data += _layout_metric_struct.pack(
+        layout_metric.baseline,
+        layout_metric.ascent,
+        layout_metric.descent,
+        layout_metric.x_height,
+        layout_metric.cap_height,
+        layout_metric.underline_position,
+        layout_metric.strikeout_position,
+    )
+
+    entries_data = bytearray()
+    for flavor in _table_flavors:
+        entries = sorted(tables.get(flavor, {}).items())
+        data += _table_struct.pack((flavor or '').encode(), len(entries), entries_offset + len(entries_data))
+        entries_data += struct.pack(f'<{len(entries)}i', *(code_point for code_point, _ in entries))
+        entries_data += struct.pack(f'<{len(entries)}I', *(glyph_index for _, glyph_index in entries))
+    data += entries_data
+
+    for glyph in glyphs:
+        data += _glyph_struct.pack(*glyph.horizontal_offset, glyph.advance_width, *glyph.vertical_offset, glyph.advance_height, glyph.bitmap.width, glyph.bitmap.height)
+    for glyph in glyphs:
+        data += glyph.bitmap.data.ljust(bitmap_stride, b'\x00')
+    return bytes(data)
+
+
+class GlyphBundle:
+    @staticmethod
+    def load(file_path: Path) -> GlyphBundle:
+        with file_path.open('rb') as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, width_mode, font_size, bitmap_stride, glyph_count, table_count, glyphs_offset, bitmaps_offset = _header_struct.unpack_from(buffer, 0)
+        if magic != _MAGIC or version != _VERSION:
+            buffer.close()
+            raise ValueError(f"incompatible glyph bundle: '{file_path}'")
+        layout_metric = LayoutMetric(*_layout_metric_struct.unpack_from(buffer, _header_struct.size))
+
+        view = memoryview(buffer)
+        tables = {}
+        for table_index in range(table_count):
+            flavor, entry_count, entries_offset = _table_struct.unpack_from(view, _header_struct.size + _layout_metric_struct.size + _table_struct.size * table_index)
+            glyph_indices_offset = entries_offset + entry_count * 4
+            tables[flavor.rstrip(b'\x00').decode() or None] = (
+                view[entries_offset:glyph_indices_offset].cast('i'),
+                view[glyph_indices_offset:glyph_indices_offset + entry_count * 4].cast('I'),
+            )
+        return GlyphBundle(buffer, view, font_size, width_mode.rstrip(b'\x00').decode(), layout_metric, bitmap_stride, glyph_count, glyphs_offset, bitmaps_offset, tables)
+
+    font_size: FontSize
+    width_mode: WidthMode
+    layout_metric: LayoutMetric
+    glyph_count: int
+    _buffer: mmap.mmap
+    _view: memoryview
+    _bitmap_stride: int
+    _glyphs_offset: int
+    _bitmaps_offset: int
+    _tables: dict[str | None, tuple[memoryview, memoryview]]
+
+    def __init__(
+            self,
+            buffer: mmap.mmap,
+            view: memoryview,
+            font_size: FontSize,
+            width_mode: WidthMode,
+            layout_metric: LayoutMetric,
+            bitmap_stride: int,
+            glyph_count: int,
+            glyphs_offset: int,
+            bitmaps_offset: int,
+            tables: dict[str | None, tuple[memoryview, memoryview]],
+    ):
+        self.font_size = font_size
+        self.width_mode = width_mode
+        self.layout_metric = layout_metric
+        self.glyph_count = glyph_count
+        self._buffer = buffer
+        self._view = view
+        self._bitmap_stride = bitmap_stride
+        self._glyphs_offset = glyphs_offset
+        self._bitmaps_offset = bitmaps_offset
+        self._tables = tables
+
+    def __enter__(self) -> GlyphBundle:
+        return self
+
+    def __exit__(self, *args: object):
+        self.close()
+
+    def get_glyph_index(self, code_point: int, language_flavor: LanguageFlavor | None = None) -> int | None:
+        for flavor in (language_flavor, None) if language_flavor is not None else (None,):
+            code_points, glyph_indices = self._tables[flavor]
+            index = bisect.bisect_left(code_points, code_point)
+            if index < len(code_points) and code_points[index] == code_point:
+                return glyph_indices[index]
+        return None
+
+    def get_glyph_by_index(self, glyph_index: int) -> BundleGlyph:
+        horizontal_offset_x, horizontal_offset_y, advance_width, vertical_offset_x, vertical_offset_y, advance_height, width, height = _glyph_struct.unpack_from(self._view, self._glyphs_offset + _glyph_struct.size * glyph_index)
+        bitmap_offset = self._bitmaps_offset + self._bitmap_stride * glyph_index
+        bitmap = PackedBitmap(width, height, self._buffer[bitmap_offset:bitmap_offset + (width + 7) // 8 * height])
+        return BundleGlyph((horizontal_offset_x, horizontal_offset_y), advance_width, (vertical_offset_x, vertical_offset_y), advance_height, bitmap)
+
+    def get_glyph(self, code_point: int, language_flavor: LanguageFlavor | None = None) -> BundleGlyph | None:
+        glyph_index = self.get_glyph_index(code_point, language_flavor)
+        if glyph_index is None:
+            return None
+        return self.get_glyph_by_index(glyph_index)
+
+    def close(self):
+        for code_points, glyph_indices in self._tables.values():
+            code_points.release()
+            glyph_indices.release()
+        self._view.release()
+        self._buffer.close()
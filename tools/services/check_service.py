@@ -1,69 +1,123 @@
-import itertools
+from collections import defaultdict
+from pathlib import Path
 
 import unicodedata2
-import unidata_blocks
-from pixel_font_knife import glyph_file_util
+from pixel_font_knife.glyph_file_util import GlyphFile, GlyphFlavorGroup
 
 from tools import configs
-from tools.configs import path_define, options
-from tools.configs.options import FontSize
+from tools.configs import options
+from tools.configs.options import FontSize, WidthMode
+from tools.services import glyph_cache_service
+from tools.services.glyph_cache_service import PackedBitmap
 
 
-def check_glyphs(font_size: FontSize):
+def _bitmap_to_int(bitmap: PackedBitmap) -> int:
+    return int.from_bytes(bitmap.data, 'big')
+
+
+def _get_east_asian_width(code_point: int) -> str:
+    if code_point == -1:
+        return 'F'
+    return unicodedata2.east_asian_width(chr(code_point))
+
+
+def _check_shape_group(
+        font_size: FontSize,
+        width_mode_dir_name: str,
+        width: int,
+        height: int,
+        items: list[tuple[int, GlyphFile, int]],
+) -> list[str]:
     canvas_size = configs.font_configs[font_size].canvas_size
+    row_bits = (width + 7) // 8 * 8
+    top_row_shift = row_bits * (height - 1)
+    right_column_mask = sum(1 << (row_bits * i + row_bits - width) for i in range(height))
+
+    is_height_valid = True
+    if width_mode_dir_name == 'common' or width_mode_dir_name == 'monospaced':
+        is_height_valid = height % font_size == 0
+    if width_mode_dir_name == 'proportional':
+        is_height_valid = height == canvas_size
+
+    errors = []
+    for code_point, glyph_file, value in items:
+        is_valid = is_height_valid
+
+        if width_mode_dir_name == 'common':
+            if configs.code_point_table.is_top_row_blank_required(code_point) and value >> top_row_shift != 0:
+                is_valid = False
+
+            if configs.code_point_table.is_right_column_blank_required(code_point) and value & right_column_mask != 0:
+                is_valid = False
+
+        if width_mode_dir_name == 'common' or width_mode_dir_name == 'monospaced':
+            match _get_east_asian_width(code_point):
+                case 'H' | 'Na':  # Halfwidth or Narrow
+                    if width != font_size / 2:
+                        is_valid = False
+                case 'F' | 'W':  # Fullwidth or Wide
+                    if width != font_size:
+                        is_valid = False
+                case _:  # Ambiguous (A) or Neutral (N)
+                    if width % (font_size / 2) != 0:
+                        is_valid = False
+
+        if not is_valid:
+            errors.append(f"[{font_size}px] glyph bitmap size error: '{glyph_file.file_path}'")
+    return errors
 
-    for width_mode_dir_name in itertools.chain(['common'], options.width_modes):
-        context = glyph_file_util.load_context(path_define.glyphs_dir.joinpath(str(font_size), width_mode_dir_name))
 
-        for code_point, flavor_group in sorted(context.items()):
-            if code_point == -1:
-                block = None
-                east_asian_width = 'F'
+def check_glyphs(font_size: FontSize, width_mode_dir_name: str) -> list[str]:
+    context, file_bitmaps = glyph_cache_service.load_packed_context(font_size, width_mode_dir_name)
+
+    errors = []
+    shape_groups = defaultdict(list)
+    for code_point, flavor_group in sorted(context.items()):
+        if code_point not in (
+                0x2E95,
+        ) and None not in flavor_group:
+            errors.append(f'[{font_size}px] missing default flavor: {width_mode_dir_name} {code_point:04X}')
+
+        bitmap_files = {}
+        for glyph_file in sorted(set(flavor_group.values()), key=lambda x: x.file_path):
+            bitmap = file_bitmaps[glyph_file.file_path]
+            if bitmap in bitmap_files:
+                errors.append(f"[{font_size}px] duplicate glyph bitmaps:\n'{glyph_file.file_path}'\n'{bitmap_files[bitmap].file_path}'")
             else:
-                block = unidata_blocks.get_block_by_code_point(code_point)
-                east_asian_width = unicodedata2.east_asian_width(chr(code_point))
-
-            if code_point not in (
-                    0x2E95,
-            ):
-                assert None in flavor_group, f'[{font_size}px] missing default flavor: {width_mode_dir_name} {code_point:04X}'
-
-            bitmap_strings = {}
-            for glyph_file in set(flavor_group.values()):
-                bitmap_string = str(glyph_file.bitmap)
-                assert bitmap_string not in bitmap_strings, f"[{font_size}px] duplicate glyph bitmaps:\n'{glyph_file.file_path}'\n'{bitmap_strings[bitmap_string].file_path}'"
-                bitmap_strings[bitmap_string] = glyph_file
-
-                if width_mode_dir_name == 'common' and block is not None and block.name not in (
-                        'Box Drawing',
-                        'Block Elements',
-                ) and code_point not in (
-                        0x25D8, 0x25D9, 0x25DA, 0x25DB,
-                        0x25E2, 0x25E3, 0x25E4, 0x25E5,
-                        0x25F8, 0x25F9, 0x25FA, 0x25FF,
-                ):
-                    if code_point not in (
-                            0x3035,
-                    ):
-                        assert all(pixel == 0 for pixel in glyph_file.bitmap[0]), f"[{font_size}px] glyph bitmap size error: '{glyph_file.file_path}'"
-
-                    if code_point not in (
-                            0x2013,
-                            0x2015,
-                            0x3030,
-                    ):
-                        assert all(glyph_file.bitmap[i][-1] == 0 for i in range(0, len(glyph_file.bitmap))), f"[{font_size}px] glyph bitmap size error: '{glyph_file.file_path}'"
-
-                if width_mode_dir_name == 'common' or width_mode_dir_name == 'monospaced':
-                    assert glyph_file.height % font_size == 0, f"[{font_size}px] glyph bitmap size error: '{glyph_file.file_path}'"
-
-                    match east_asian_width:
-                        case 'H' | 'Na':  # Halfwidth or Narrow
-                            assert glyph_file.width == font_size / 2, f"[{font_size}px] glyph bitmap size error: '{glyph_file.file_path}'"
-                        case 'F' | 'W':  # Fullwidth or Wide
-                            assert glyph_file.width == font_size, f"[{font_size}px] glyph bitmap size error: '{glyph_file.file_path}'"
-                        case _:  # Ambiguous (A) or Neutral (N)
-                            assert glyph_file.width % (font_size / 2) == 0, f"[{font_size}px] glyph bitmap size error: '{glyph_file.file_path}'"
-
-                if width_mode_dir_name == 'proportional':
-                    assert glyph_file.height == canvas_size, f"[{font_size}px] glyph bitmap size error: '{glyph_file.file_path}'"
+                bitmap_files[bitmap] = glyph_file
+            shape_groups[bitmap.width, bitmap.height].append((code_point, glyph_file, _bitmap_to_int(bitmap)))
+
+    for (width, height), items in shape_groups.items():
+        errors.extend(_check_shape_group(font_size, width_mode_dir_name, width, height, items))
+    return errors
+
+
+def _check_cross_directory_glyphs(
+        font_size: FontSize,
+        width_mode: WidthMode,
+        common_context: dict[int, GlyphFlavorGroup],
+        common_file_bitmaps: dict[Path, PackedBitmap],
+) -> list[str]:
+    context, file_bitmaps = glyph_cache_service.load_packed_context(font_size, width_mode)
+
+    errors = []
+    for code_point, flavor_group in sorted(context.items()):
+        if code_point not in common_context:
+            continue
+        common_flavor_group = common_context[code_point]
+        for flavor, glyph_file in flavor_group.items():
+            if flavor not in common_flavor_group:
+                continue
+            common_glyph_file = common_flavor_group[flavor]
+            if file_bitmaps[glyph_file.file_path] == common_file_bitmaps[common_glyph_file.file_path]:
+                errors.append(f"[{font_size}px] duplicate glyph bitmaps across directories:\n'{glyph_file.file_path}'\n'{common_glyph_file.file_path}'")
+    return errors
+
+
+def check_cross_directory_glyphs(font_size: FontSize) -> list[str]:
+    common_context, common_file_bitmaps = glyph_cache_service.load_packed_context(font_size, 'common')
+
+    errors = []
+    for width_mode in options.width_modes:
+        errors.extend(_check_cross_directory_glyphs(font_size, width_mode, common_context, common_file_bitmaps))
+    return errors
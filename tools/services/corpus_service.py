@@ -0,0 +1,35 @@
+import glob
+from pathlib import Path
+
+import unicodedata2
+from loguru import logger
+
+_read_size = 1024 * 1024
+
+_fallback_chars = {' ', '\u00A0', '\u3000'}
+
+
+def get_corpus_file_paths(patterns: list[str]) -> list[Path]:
+    file_paths = []
+    for pattern in patterns:
+        pattern_file_paths = sorted(Path(file_path) for file_path in glob.glob(pattern, recursive=True) if Path(file_path).is_file())
+        if len(pattern_file_paths) == 0:
+            raise FileNotFoundError(f"no corpus files: '{pattern}'")
+        for file_path in pattern_file_paths:
+            if file_path not in file_paths:
+                file_paths.append(file_path)
+    return file_paths
+
+
+def load_alphabet(file_paths: list[Path]) -> set[str]:
+    alphabet = set(_fallback_chars)
+    for file_path in file_paths:
+        with file_path.open('r', encoding='utf-8') as file:
+            while text := file.read(_read_size):
+                alphabet.update(text)
+        logger.info("Load corpus: '{}'", file_path)
+    return {c for c in alphabet if not unicodedata2.category(c).startswith(('C', 'Zl', 'Zp'))}
+
+
+def get_missing_chars(alphabet: set[str], font_alphabet: set[str]) -> list[str]:
+    return sorted(c for c in alphabet if c not in font_alphabet and c not in _fallback_chars)
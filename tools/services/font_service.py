@@ -1,59 +1,326 @@
+import hashlib
 import itertools
+import json
 import math
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from importlib import metadata
+from io import BytesIO
+from pathlib import Path
 
-import unidata_blocks
+from fontTools.ttLib import TTFont
 from loguru import logger
 from pixel_font_builder import FontBuilder, WeightName, SerifStyle, SlantStyle, WidthStyle, Glyph
-from pixel_font_knife import glyph_file_util, glyph_mapping_util, kerning_util
-from pixel_font_knife.glyph_file_util import GlyphFlavorGroup
+from pixel_font_knife import glyph_mapping_util
+from pixel_font_knife.glyph_file_util import GlyphFile, GlyphFlavorGroup
 
 from tools import configs
 from tools.configs import path_define, options
 from tools.configs.options import FontSize, WidthMode, LanguageFlavor, FontFormat
+from tools.services import atlas_service, bundle_service, glyph_cache_service, kerning_cache_service, profile_service
+from tools.services.bundle_service import BundleGlyph
+from tools.services.glyph_cache_service import PackedBitmap, GlyphBitmapStore
+from tools.services.publish_service import ReleaseZipPacker
 
 
-class DesignContext:
+class _GlyphTable:
     @staticmethod
-    def load(font_size: FontSize) -> DesignContext:
-        contexts = {}
-        for width_mode_dir_name in itertools.chain(['common'], options.width_modes):
-            context = glyph_file_util.load_context(path_define.glyphs_dir.joinpath(str(font_size), width_mode_dir_name))
-            for mapping in configs.mappings:
-                glyph_mapping_util.apply_mapping(context, mapping)
-            contexts[width_mode_dir_name] = context
+    def create(context: dict[int, GlyphFlavorGroup]) -> _GlyphTable:
+        base_glyph_files = []
+        flavor_glyph_files = {}
+        for code_point, flavor_group in sorted(context.items()):
+            if code_point < -1:
+                continue
+            base_glyph_files.append((code_point, flavor_group.get(None)))
+            if code_point == -1:
+                continue
+            for flavor, glyph_file in flavor_group.items():
+                if flavor is not None:
+                    flavor_glyph_files.setdefault(flavor, {})[code_point] = glyph_file
+
+        base_character_mapping = {}
+        for code_point, flavor_group in context.items():
+            if code_point < 0:
+                continue
+            base_character_mapping[code_point] = flavor_group[None].glyph_name if None in flavor_group else None
+
+        return _GlyphTable(base_glyph_files, base_character_mapping, flavor_glyph_files)
+
+    base_glyph_files: list[tuple[int, GlyphFile | None]]
+    base_character_mapping: dict[int, str | None]
+    flavor_glyph_files: dict[str, dict[int, GlyphFile]]
+    glyphs: dict[str, Glyph]
+
+    def __init__(
+            self,
+            base_glyph_files: list[tuple[int, GlyphFile | None]],
+            base_character_mapping: dict[int, str | None],
+            flavor_glyph_files: dict[str, dict[int, GlyphFile]],
+    ):
+        self.base_glyph_files = base_glyph_files
+        self.base_character_mapping = base_character_mapping
+        self.flavor_glyph_files = flavor_glyph_files
+        self.glyphs = {}
+
+    def get_glyph_sequence(self, flavor: str | None = None) -> list[GlyphFile]:
+        overlay = self.flavor_glyph_files.get(flavor, {})
+        glyph_sequence = []
+        glyph_names = set()
+        for code_point, glyph_file in self.base_glyph_files:
+            glyph_file = overlay.get(code_point, glyph_file)
+            if glyph_file is None:
+                raise KeyError(f'no flavor file: {flavor!r}')
+            glyph_name = glyph_file.glyph_name
+            if glyph_name not in glyph_names:
+                glyph_names.add(glyph_name)
+                glyph_sequence.append(glyph_file)
+        return glyph_sequence
+
+    def get_character_mapping(self, flavor: str | None = None) -> dict[int, str]:
+        character_mapping = self.base_character_mapping.copy()
+        for code_point, glyph_file in self.flavor_glyph_files.get(flavor, {}).items():
+            character_mapping[code_point] = glyph_file.glyph_name
+        if None in character_mapping.values():
+            raise KeyError(f'no flavor file: {flavor!r}')
+        return character_mapping
+
+
+_wrapped_font_formats: dict[FontFormat, tuple[FontFormat, str]] = {
+    'otf.woff': ('otf', 'woff'),
+    'otf.woff2': ('otf', 'woff2'),
+    'ttf.woff': ('ttf', 'woff'),
+    'ttf.woff2': ('ttf', 'woff2'),
+}
+
+_unshared_font_formats: list[FontFormat] = ['bdf', 'pcf']
+
+_web_font_chunk_size = 1024
+
+_fingerprint_module_file_paths = [
+    Path(__file__),
+    Path(glyph_cache_service.__file__),
+    Path(kerning_cache_service.__file__),
+    Path(configs.code_point.__file__),
+    Path(atlas_service.__file__),
+]
+
+_fingerprint_package_names = [
+    'pixel-font-builder',
+    'pixel-font-knife',
+    'bdffont',
+    'pcffont',
+    'fonttools',
+]
+
+
+def dump_font(builder: FontBuilder, font_format: FontFormat) -> bytes:
+    if font_format == 'atlas.zip':
+        return atlas_service.dump_atlas(builder)
+    format_builder = getattr(builder, f'to_{font_format.replace('.', '_')}_builder')()
+    if font_format == 'bdf':
+        return format_builder.dump_to_string().encode('utf-8')
+    elif font_format == 'pcf':
+        return format_builder.build().dump_to_bytes()
+    elif font_format == 'dfont':
+        return format_builder.dump_to_bytes()
+    else:
+        stream = BytesIO()
+        format_builder.save(stream)
+        return stream.getvalue()
+
+
+def wrap_font(font_data: bytes, flavor: str) -> bytes:
+    font = TTFont(BytesIO(font_data), recalcTimestamp=False, recalcBBoxes=False)
+    font.flavor = flavor
+    stream = BytesIO()
+    font.save(stream)
+    return stream.getvalue()
 
-        glyph_files = {
-            width_mode: contexts['common'] | contexts[width_mode]
-            for width_mode in options.width_modes
-        }
 
-        return DesignContext(font_size, glyph_files)
+def _split_web_font_chunks(code_points: list[int]) -> list[list[int]]:
+    chunks = []
+    chunk_code_points = []
+    for _, block_code_points in itertools.groupby(sorted(code_points), key=configs.code_point_table.get_block_index):
+        block_code_points = list(block_code_points)
+        if len(chunk_code_points) > 0 and len(chunk_code_points) + len(block_code_points) > _web_font_chunk_size:
+            chunks.append(chunk_code_points)
+            chunk_code_points = []
+        chunk_code_points.extend(block_code_points)
+        while len(chunk_code_points) > _web_font_chunk_size:
+            chunks.append(chunk_code_points[:_web_font_chunk_size])
+            chunk_code_points = chunk_code_points[_web_font_chunk_size:]
+    if len(chunk_code_points) > 0:
+        chunks.append(chunk_code_points)
+    return chunks
+
+
+def _format_unicode_range(code_points: list[int]) -> str:
+    ranges = []
+    for code_point in code_points:
+        if len(ranges) > 0 and ranges[-1][1] == code_point - 1:
+            ranges[-1][1] = code_point
+        else:
+            ranges.append([code_point, code_point])
+    return ', '.join(f'U+{start:04X}' if start == end else f'U+{start:04X}-{end:04X}' for start, end in ranges)
+
+
+class DesignContext:
+    @staticmethod
+    def load(font_size: FontSize) -> DesignContext:
+        return DesignContext(font_size)
 
     font_size: FontSize
+    _glyph_bitmap_stores: dict[str, GlyphBitmapStore]
+    _file_path_to_glyph_bitmap_store: dict[Path, GlyphBitmapStore]
+    _bitmap_pool: dict[PackedBitmap, PackedBitmap]
+    _bitmap_rows: dict[PackedBitmap, list[list[int]]]
     _glyph_files: dict[WidthMode, dict[int, GlyphFlavorGroup]]
     _alphabet_cache: dict[str, set[str]]
+    _glyph_tables: dict[WidthMode, _GlyphTable]
     _proportional_kerning_values: dict[tuple[str, str], int] | None
 
-    def __init__(
-            self,
-            font_size: FontSize,
-            glyph_files: dict[WidthMode, dict[int, GlyphFlavorGroup]],
-    ):
+    def __init__(self, font_size: FontSize):
         self.font_size = font_size
-        self._glyph_files = glyph_files
+        self._glyph_bitmap_stores = {}
+        self._file_path_to_glyph_bitmap_store = {}
+        self._bitmap_pool = {}
+        self._bitmap_rows = {}
+        self._glyph_files = {}
         self._alphabet_cache = {}
+        self._glyph_tables = {}
         self._proportional_kerning_values = None
 
+    def _get_glyph_bitmap_store(self, width_mode_dir_name: str) -> GlyphBitmapStore:
+        if width_mode_dir_name in self._glyph_bitmap_stores:
+            glyph_bitmap_store = self._glyph_bitmap_stores[width_mode_dir_name]
+        else:
+            with profile_service.measure('load_glyphs', font_size=self.font_size, width_mode_dir_name=width_mode_dir_name):
+                glyph_bitmap_store = GlyphBitmapStore.load(self.font_size, width_mode_dir_name, self._bitmap_pool)
+            for flavor_group in glyph_bitmap_store.context.values():
+                for glyph_file in flavor_group.values():
+                    self._file_path_to_glyph_bitmap_store[glyph_file.file_path] = glyph_bitmap_store
+            for mapping in configs.mappings:
+                glyph_mapping_util.apply_mapping(glyph_bitmap_store.context, mapping)
+            self._glyph_bitmap_stores[width_mode_dir_name] = glyph_bitmap_store
+        return glyph_bitmap_store
+
+    def _get_glyph_files(self, width_mode: WidthMode) -> dict[int, GlyphFlavorGroup]:
+        if width_mode in self._glyph_files:
+            glyph_files = self._glyph_files[width_mode]
+        else:
+            glyph_files = self._get_glyph_bitmap_store('common').context | self._get_glyph_bitmap_store(width_mode).context
+            self._glyph_files[width_mode] = glyph_files
+        return glyph_files
+
+    def _get_bitmap(self, file_path: Path) -> PackedBitmap:
+        return self._file_path_to_glyph_bitmap_store[file_path].get_bitmap(file_path)
+
+    def _get_bitmap_rows(self, bitmap: PackedBitmap) -> list[list[int]]:
+        if bitmap in self._bitmap_rows:
+            bitmap_rows = self._bitmap_rows[bitmap]
+        else:
+            bitmap_rows = bitmap.to_rows()
+            self._bitmap_rows[bitmap] = bitmap_rows
+        return bitmap_rows
+
+    def _get_file_digest(self, file_path: Path) -> bytes:
+        return self._file_path_to_glyph_bitmap_store[file_path].get_digest(file_path)
+
+    def save_glyph_caches(self):
+        for glyph_bitmap_store in self._glyph_bitmap_stores.values():
+            glyph_bitmap_store.save()
+
     def get_alphabet(self, width_mode: WidthMode) -> set[str]:
         if width_mode in self._alphabet_cache:
             alphabet = self._alphabet_cache[width_mode]
         else:
-            alphabet = {chr(code_point) for code_point in self._glyph_files[width_mode] if code_point >= 0}
+            alphabet = {chr(code_point) for code_point in self._get_glyph_files(width_mode) if code_point >= 0}
             self._alphabet_cache[width_mode] = alphabet
         return alphabet
 
-    def _create_builder(self, width_mode: WidthMode, language_flavor: LanguageFlavor) -> FontBuilder:
+    def _get_glyph_table(self, width_mode: WidthMode) -> _GlyphTable:
+        if width_mode in self._glyph_tables:
+            glyph_table = self._glyph_tables[width_mode]
+        else:
+            glyph_table = _GlyphTable.create(self._get_glyph_files(width_mode))
+            self._glyph_tables[width_mode] = glyph_table
+        return glyph_table
+
+    def _get_glyph(self, width_mode: WidthMode, glyph_file: GlyphFile) -> Glyph:
+        glyphs = self._get_glyph_table(width_mode).glyphs
+        glyph_name = glyph_file.glyph_name
+        if glyph_name in glyphs:
+            return glyphs[glyph_name]
+
+        layout_metric = configs.font_configs[self.font_size].layout_metrics[width_mode]
+        code_point = glyph_file.code_point
+        bitmap = self._get_bitmap(glyph_file.file_path)
+
+        horizontal_offset_x = 0
+        horizontal_offset_y = layout_metric.baseline - self.font_size - (bitmap.height - self.font_size) // 2
+        advance_width = bitmap.width
+
+        advance_height = self.font_size * configs.code_point_table.get_advance_height_scale(code_point)
+        vertical_offset_x = -math.ceil(bitmap.width / 2)
+        vertical_offset_y = (advance_height - bitmap.height) // 2 + configs.code_point_table.get_vertical_offset_adjustment(code_point)
+
+        glyph = Glyph(
+            name=glyph_name,
+            horizontal_offset=(horizontal_offset_x, horizontal_offset_y),
+            advance_width=advance_width,
+            vertical_offset=(vertical_offset_x, vertical_offset_y),
+            advance_height=advance_height,
+            bitmap=self._get_bitmap_rows(bitmap),
+        )
+        glyphs[glyph_name] = glyph
+        return glyph
+
+    def _get_proportional_kerning_values(self) -> dict[tuple[str, str], int]:
+        if self._proportional_kerning_values is None:
+            with profile_service.measure('kerning', font_size=self.font_size):
+                self._proportional_kerning_values = kerning_cache_service.get_kerning_values(self.font_size, configs.kerning_config, self._get_glyph_files('proportional'), self._get_bitmap)
+        return self._proportional_kerning_values
+
+    def update_glyph_bitmaps(self, file_paths: set[Path]) -> dict[WidthMode, set[LanguageFlavor]] | None:
+        if any(file_path not in self._file_path_to_glyph_bitmap_store or not file_path.is_file() for file_path in file_paths):
+            return None
+
+        reloaded_glyph_files = {}
+        for file_path in file_paths:
+            self._file_path_to_glyph_bitmap_store[file_path].invalidate(file_path)
+            reloaded_glyph_files[file_path] = GlyphFile.load(file_path)
+
+        kerning_code_points = {ord(c) for alphabet in configs.kerning_config.groups.values() for c in alphabet}
+        affected_language_flavors = {}
+        for width_mode, context in self._glyph_files.items():
+            language_flavors = set()
+            glyph_names = set()
+            for code_point, flavor_group in context.items():
+                for flavor, glyph_file in list(flavor_group.items()):
+                    if glyph_file.file_path not in file_paths:
+                        continue
+                    flavor_group[flavor] = reloaded_glyph_files[glyph_file.file_path]
+                    glyph_names.add(glyph_file.glyph_name)
+                    if flavor is None:
+                        language_flavors.update(language_flavor for language_flavor in options.language_flavors if language_flavor not in flavor_group)
+                        if width_mode == 'proportional' and code_point in kerning_code_points:
+                            self._proportional_kerning_values = None
+                            language_flavors.update(options.language_flavors)
+                    elif flavor in options.language_flavors:
+                        language_flavors.add(flavor)
+            if width_mode in self._glyph_tables and len(glyph_names) > 0:
+                glyph_table = _GlyphTable.create(context)
+                glyph_table.glyphs = {glyph_name: glyph for glyph_name, glyph in self._glyph_tables[width_mode].glyphs.items() if glyph_name not in glyph_names}
+                self._glyph_tables[width_mode] = glyph_table
+            affected_language_flavors[width_mode] = language_flavors
+        return affected_language_flavors
+
+    def release_glyphs(self):
+        for glyph_table in self._glyph_tables.values():
+            glyph_table.glyphs.clear()
+        self._bitmap_rows.clear()
+
+    def create_builder(self, width_mode: WidthMode, language_flavor: LanguageFlavor, share_glyphs: bool = True, alphabet: set[str] | None = None) -> FontBuilder:
         layout_metric = configs.font_configs[self.font_size].layout_metrics[width_mode]
 
         builder = FontBuilder()
@@ -86,52 +353,33 @@ class DesignContext:
         builder.meta_info.designer_url = 'https://takwolf.com'
         builder.meta_info.license_url = 'https://github.com/TakWolf/ark-pixel-font/blob/master/LICENSE-OFL'
 
-        glyph_sequence = glyph_file_util.get_glyph_sequence(self._glyph_files[width_mode], [language_flavor])
-        for glyph_file in glyph_sequence:
-            code_point = glyph_file.code_point
-            block = unidata_blocks.get_block_by_code_point(code_point)
-
-            horizontal_offset_x = 0
-            horizontal_offset_y = layout_metric.baseline - self.font_size - (glyph_file.height - self.font_size) // 2
-            advance_width = glyph_file.width
-
-            vertical_offset_x = -math.ceil(glyph_file.width / 2)
-            if code_point in (
-                    0x3031, 0x3032,
-            ):
-                vertical_offset_y = (self.font_size * 2 - glyph_file.height) // 2
-                advance_height = self.font_size * 2
-            else:
-                vertical_offset_y = (self.font_size - glyph_file.height) // 2
-                advance_height = self.font_size
-
-            if block is not None and block.name not in (
-                    'Box Drawing',
-                    'Block Elements',
-            ) and code_point not in (
-                    0x25D8, 0x25D9, 0x25DA, 0x25DB,
-                    0x25E2, 0x25E3, 0x25E4, 0x25E5,
-                    0x25F8, 0x25F9, 0x25FA, 0x25FF,
-                    0x3031, 0x3032, 0x3033, 0x3034, 0x3035,
-            ):
-                vertical_offset_y -= 1
-
-            builder.glyphs.append(Glyph(
-                name=glyph_file.glyph_name,
-                horizontal_offset=(horizontal_offset_x, horizontal_offset_y),
-                advance_width=advance_width,
-                vertical_offset=(vertical_offset_x, vertical_offset_y),
-                advance_height=advance_height,
-                bitmap=glyph_file.bitmap.data,
-            ))
-
-        character_mapping = glyph_file_util.get_character_mapping(self._glyph_files[width_mode], language_flavor)
-        builder.character_mapping.update(character_mapping)
+        glyph_table = self._get_glyph_table(width_mode)
+        character_mapping = glyph_table.get_character_mapping(language_flavor)
+        if alphabet is not None:
+            character_mapping = {code_point: glyph_name for code_point, glyph_name in character_mapping.items() if chr(code_point) in alphabet}
+        glyph_names = set(character_mapping.values())
 
         if width_mode == 'proportional':
-            if self._proportional_kerning_values is None:
-                self._proportional_kerning_values = kerning_util.calculate_kerning_values(configs.kerning_config, self._glyph_files['proportional'])
-            builder.kerning_values.update(self._proportional_kerning_values)
+            for (left_glyph_name, right_glyph_name), offset in self._get_proportional_kerning_values().items():
+                if alphabet is None or (left_glyph_name in glyph_names and right_glyph_name in glyph_names):
+                    builder.kerning_values[left_glyph_name, right_glyph_name] = offset
+        kerning_glyph_names = {glyph_name for glyph_names in builder.kerning_values for glyph_name in glyph_names}
+
+        shared_glyph_names = {}
+        glyph_keys = {}
+        for glyph_file in glyph_table.get_glyph_sequence(language_flavor):
+            if alphabet is not None and glyph_file.code_point >= 0 and glyph_file.glyph_name not in glyph_names:
+                continue
+            glyph = self._get_glyph(width_mode, glyph_file)
+            if share_glyphs and glyph_file.code_point >= 0 and glyph.name not in kerning_glyph_names:
+                glyph_key = glyph.horizontal_offset, glyph.advance_width, glyph.vertical_offset, glyph.advance_height, self._get_bitmap(glyph_file.file_path)
+                if glyph_key in glyph_keys:
+                    shared_glyph_names[glyph.name] = glyph_keys[glyph_key]
+                    continue
+                glyph_keys[glyph_key] = glyph.name
+            builder.glyphs.append(glyph)
+        for code_point, glyph_name in character_mapping.items():
+            builder.character_mapping[code_point] = shared_glyph_names.get(glyph_name, glyph_name)
 
         builder.opentype_config.fields_override.head_y_max = layout_metric.ascent
         builder.opentype_config.fields_override.head_y_min = layout_metric.descent
@@ -141,13 +389,200 @@ class DesignContext:
 
         return builder
 
-    def make_fonts(self, width_mode: WidthMode, font_formats: list[FontFormat]):
+    def _get_fingerprint(self, width_mode: WidthMode, language_flavor: LanguageFlavor, alphabet: set[str] | None = None) -> str:
+        layout_metric = configs.font_configs[self.font_size].layout_metrics[width_mode]
+
+        hasher = hashlib.sha256()
+        hasher.update(configs.version.encode())
+        for package_name in _fingerprint_package_names:
+            hasher.update(f'|{package_name}=={metadata.version(package_name)}'.encode())
+        for module_file_path in _fingerprint_module_file_paths:
+            hasher.update(module_file_path.read_bytes())
+        hasher.update(f'{self.font_size}|{width_mode}|{language_flavor}'.encode())
+        if alphabet is not None:
+            hasher.update(''.join(sorted(alphabet)).encode())
+        hasher.update(json.dumps(vars(layout_metric), sort_keys=True).encode())
+        hasher.update(configs.kerning_config_file_path.read_bytes())
+        for mapping_file_path in configs.mapping_file_paths:
+            hasher.update(mapping_file_path.read_bytes())
+
+        glyph_table = self._get_glyph_table(width_mode)
+        for glyph_file in glyph_table.get_glyph_sequence(language_flavor):
+            hasher.update(glyph_file.glyph_name.encode())
+            hasher.update(self._get_file_digest(glyph_file.file_path))
+        for code_point, glyph_name in sorted(glyph_table.get_character_mapping(language_flavor).items()):
+            hasher.update(f'{code_point:04X}:{glyph_name}'.encode())
+
+        if width_mode == 'proportional':
+            for group_alphabet in configs.kerning_config.groups.values():
+                for c in group_alphabet:
+                    code_point = ord(c)
+                    if code_point in self._get_glyph_files('proportional'):
+                        glyph_file = self._get_glyph_files('proportional')[code_point].get_file()
+                        hasher.update(self._get_file_digest(glyph_file.file_path))
+
+        return hasher.hexdigest()
+
+    def make_font(self, width_mode: WidthMode, language_flavor: LanguageFlavor, font_formats: list[FontFormat], alphabet: set[str] | None = None) -> dict[FontFormat, bytes]:
+        if alphabet is None:
+            outputs_dir = path_define.outputs_dir
+            manifests_dir = path_define.font_manifests_dir
+        else:
+            outputs_dir = path_define.subsets_dir
+            manifests_dir = path_define.subset_manifests_dir
+        outputs_dir.mkdir(parents=True, exist_ok=True)
+
+        manifest_file_path = manifests_dir.joinpath(f'ark-pixel-{self.font_size}px-{width_mode}-{language_flavor}.json')
+        if manifest_file_path.is_file():
+            manifest = json.loads(manifest_file_path.read_bytes())
+        else:
+            manifest = {}
+        fingerprint = self._get_fingerprint(width_mode, language_flavor, alphabet)
+
+        font_datas = {}
+        stale_font_formats = []
+        for font_format in font_formats:
+            file_path = outputs_dir.joinpath(f'ark-pixel-{self.font_size}px-{width_mode}-{language_flavor}.{font_format}')
+            if manifest.get(font_format) == fingerprint and file_path.is_file():
+                font_datas[font_format] = file_path.read_bytes()
+                logger.info("Skip unchanged font: '{}'", file_path)
+            else:
+                stale_font_formats.append(font_format)
+        if len(stale_font_formats) == 0:
+            self.save_glyph_caches()
+            return font_datas
+
+        for other_width_mode, glyph_table in self._glyph_tables.items():
+            if other_width_mode != width_mode:
+                glyph_table.glyphs.clear()
+        builders = {}
+        compiled_font_datas = {}
+        for font_format in stale_font_formats:
+            compiled_font_format = _wrapped_font_formats[font_format][0] if font_format in _wrapped_font_formats else font_format
+            if compiled_font_format not in compiled_font_datas:
+                share_glyphs = compiled_font_format not in _unshared_font_formats
+                if share_glyphs not in builders:
+                    with profile_service.measure('build', font_size=self.font_size, width_mode=width_mode, language_flavor=language_flavor, share_glyphs=share_glyphs):
+                        builders[share_glyphs] = self.create_builder(width_mode, language_flavor, share_glyphs, alphabet)
+                with profile_service.measure('font', font_size=self.font_size, width_mode=width_mode, language_flavor=language_flavor, font_format=compiled_font_format):
+                    compiled_font_datas[compiled_font_format] = dump_font(builders[share_glyphs], compiled_font_format)
+
+        with profile_service.measure('wrap', font_size=self.font_size, width_mode=width_mode, language_flavor=language_flavor):
+            with ThreadPoolExecutor() as executor:
+                wrap_futures = {
+                    font_format: executor.submit(wrap_font, compiled_font_datas[compiled_font_format], flavor)
+                    for font_format, (compiled_font_format, flavor) in _wrapped_font_formats.items()
+                    if font_format in stale_font_formats
+                }
+
+        for font_format in stale_font_formats:
+            file_path = outputs_dir.joinpath(f'ark-pixel-{self.font_size}px-{width_mode}-{language_flavor}.{font_format}')
+            font_data = wrap_futures[font_format].result() if font_format in wrap_futures else compiled_font_datas[font_format]
+            file_path.write_bytes(font_data)
+            font_datas[font_format] = font_data
+            logger.info("Make font: '{}'", file_path)
+            manifest[font_format] = fingerprint
+
+        manifests_dir.mkdir(parents=True, exist_ok=True)
+        manifest_file_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), 'utf-8')
+        self.save_glyph_caches()
+
+        return font_datas
+
+    def make_web_fonts(self, width_mode: WidthMode, language_flavor: LanguageFlavor):
+        font_name = f'ark-pixel-{self.font_size}px-{width_mode}-{language_flavor}'
+        css_file_path = path_define.web_fonts_dir.joinpath(f'{font_name}.css')
+        manifest_file_path = path_define.font_manifests_dir.joinpath(f'{font_name}.json')
+        if manifest_file_path.is_file():
+            manifest = json.loads(manifest_file_path.read_bytes())
+        else:
+            manifest = {}
+        fingerprint = self._get_fingerprint(width_mode, language_flavor)
+        if manifest.get('web') == fingerprint and css_file_path.is_file():
+            logger.info("Skip unchanged web fonts: '{}'", css_file_path)
+            return
+
+        with profile_service.measure('build', font_size=self.font_size, width_mode=width_mode, language_flavor=language_flavor, share_glyphs=True):
+            builder = self.create_builder(width_mode, language_flavor)
+        chunks = _split_web_font_chunks(list(builder.character_mapping))
+
+        path_define.web_fonts_dir.mkdir(parents=True, exist_ok=True)
+        for file_path in path_define.web_fonts_dir.glob(f'{font_name}-*.woff2'):
+            file_path.unlink()
+        font_faces = []
+        with profile_service.measure('web_fonts', font_size=self.font_size, width_mode=width_mode, language_flavor=language_flavor):
+            for index, code_points in enumerate(chunks):
+                chunk_builder = builder.copy()
+                chunk_builder.character_mapping = {code_point: builder.character_mapping[code_point] for code_point in code_points}
+                glyph_names = set(chunk_builder.character_mapping.values())
+                chunk_builder.glyphs = [glyph for glyph in builder.glyphs if glyph.name == '.notdef' or glyph.name in glyph_names]
+                chunk_builder.kerning_values = {(left_glyph_name, right_glyph_name): offset for (left_glyph_name, right_glyph_name), offset in builder.kerning_values.items() if left_glyph_name in glyph_names and right_glyph_name in glyph_names}
+
+                file_name = f'{font_name}-{index}.woff2'
+                path_define.web_fonts_dir.joinpath(file_name).write_bytes(wrap_font(dump_font(chunk_builder, 'otf'), 'woff2'))
+                font_faces.append(
+                    '@font-face {\n'
+                    f'    font-family: {font_name};\n'
+                    f'    src: url("{file_name}");\n'
+                    f'    unicode-range: {_format_unicode_range(code_points)};\n'
+                    '}\n'
+                )
+        css_file_path.write_text('\n'.join(font_faces), 'utf-8')
+        logger.info("Make web fonts: '{}' ({} chunks)", css_file_path, len(chunks))
+
+        manifest['web'] = fingerprint
+        path_define.font_manifests_dir.mkdir(parents=True, exist_ok=True)
+        manifest_file_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), 'utf-8')
+        self.save_glyph_caches()
+
+    def make_glyph_bundle(self, width_mode: WidthMode):
+        glyph_table = self._get_glyph_table(width_mode)
+        glyph_files = [glyph_file for _, glyph_file in glyph_table.base_glyph_files if glyph_file is not None]
+        for language_flavor in options.language_flavors:
+            glyph_files.extend(glyph_table.flavor_glyph_files.get(language_flavor, {}).values())
+
+        glyphs = []
+        glyph_keys = {}
+        glyph_name_to_index = {}
+        for glyph_file in glyph_files:
+            if glyph_file.glyph_name in glyph_name_to_index:
+                continue
+            glyph = self._get_glyph(width_mode, glyph_file)
+            bitmap = self._get_bitmap(glyph_file.file_path)
+            glyph_key = glyph.horizontal_offset, glyph.advance_width, glyph.vertical_offset, glyph.advance_height, bitmap
+            if glyph_key not in glyph_keys:
+                glyph_keys[glyph_key] = len(glyphs)
+                glyphs.append(BundleGlyph(glyph.horizontal_offset, glyph.advance_width, glyph.vertical_offset, glyph.advance_height, bitmap))
+            glyph_name_to_index[glyph_file.glyph_name] = glyph_keys[glyph_key]
+
+        tables = {None: {code_point: glyph_name_to_index[glyph_file.glyph_name] for code_point, glyph_file in glyph_table.base_glyph_files if glyph_file is not None}}
+        for language_flavor in options.language_flavors:
+            table = {}
+            for code_point, glyph_file in glyph_table.flavor_glyph_files.get(language_flavor, {}).items():
+                glyph_index = glyph_name_to_index[glyph_file.glyph_name]
+                if tables[None].get(code_point) != glyph_index:
+                    table[code_point] = glyph_index
+            tables[language_flavor] = table
+
+        layout_metric = configs.font_configs[self.font_size].layout_metrics[width_mode]
         path_define.outputs_dir.mkdir(parents=True, exist_ok=True)
+        file_path = path_define.outputs_dir.joinpath(f'ark-pixel-{self.font_size}px-{width_mode}.bundle')
+        file_path.write_bytes(bundle_service.dump_glyph_bundle(self.font_size, width_mode, layout_metric, glyphs, tables))
+        logger.info("Make glyph bundle: '{}' ({} glyphs)", file_path, len(glyphs))
 
-        if len(font_formats) > 0:
+    def make_fonts(
+            self,
+            width_mode: WidthMode,
+            font_formats: list[FontFormat],
+            release_zip_packer: ReleaseZipPacker | None = None,
+            web_fonts: bool = False,
+            alphabet: set[str] | None = None,
+    ):
+        if len(font_formats) > 0 or web_fonts:
             for language_flavor in options.language_flavors:
-                builder = self._create_builder(width_mode, language_flavor)
-                for font_format in font_formats:
-                    file_path = path_define.outputs_dir.joinpath(f'ark-pixel-{self.font_size}px-{width_mode}-{language_flavor}.{font_format}')
-                    getattr(builder, f'save_{font_format.replace('.', '_')}')(file_path)
-                    logger.info("Make font: '{}'", file_path)
+                font_datas = self.make_font(width_mode, language_flavor, font_formats, alphabet)
+                if release_zip_packer is not None:
+                    release_zip_packer.add_fonts(language_flavor, font_datas)
+                if web_fonts:
+                    self.make_web_fonts(width_mode, language_flavor)
+            self.release_glyphs()
@@ -1,16 +1,44 @@
-import itertools
+import json
+import os
 
+from loguru import logger
 from pixel_font_knife import glyph_file_util, glyph_mapping_util
+from pixel_font_knife.glyph_file_util import GlyphFlavorGroup
 
 from tools.configs import path_define, options
 from tools.configs.options import FontSize
+from tools.services.glyph_cache_service import GlyphBitmapStore
 
 
-def format_glyphs(font_size: FontSize):
-    for width_mode_dir_name in itertools.chain(['common'], options.width_modes):
-        width_mode_dir = path_define.glyphs_dir.joinpath(str(font_size), width_mode_dir_name)
-        context = glyph_file_util.load_context(width_mode_dir)
-        glyph_file_util.normalize_context(context, width_mode_dir, options.language_flavors)
+def format_glyphs(font_size: FontSize, width_mode_dir_name: str):
+    manifest_file_path = path_define.format_manifests_dir.joinpath(f'{font_size}px-{width_mode_dir_name}.json')
+    if manifest_file_path.is_file():
+        manifest = json.loads(manifest_file_path.read_bytes())
+    else:
+        manifest = {}
+
+    glyph_bitmap_store = GlyphBitmapStore.load(font_size, width_mode_dir_name)
+    root_dir = glyph_bitmap_store.root_dir
+    dirty_context = {}
+    for code_point, flavor_group in glyph_bitmap_store.context.items():
+        for flavor, glyph_file in flavor_group.items():
+            file_key = glyph_file.file_path.relative_to(root_dir).as_posix()
+            if manifest.get(file_key) != glyph_bitmap_store.get_digest(glyph_file.file_path).hex():
+                dirty_context.setdefault(code_point, GlyphFlavorGroup())[flavor] = glyph_file
+    glyph_file_util.normalize_context(dirty_context, root_dir, options.language_flavors)
+
+    glyph_bitmap_store = GlyphBitmapStore.load(font_size, width_mode_dir_name)
+    manifest = {}
+    for flavor_group in glyph_bitmap_store.context.values():
+        for glyph_file in flavor_group.values():
+            manifest[glyph_file.file_path.relative_to(root_dir).as_posix()] = glyph_bitmap_store.get_digest(glyph_file.file_path).hex()
+    glyph_bitmap_store.save()
+
+    manifest_file_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file_path = manifest_file_path.with_name(f'{manifest_file_path.name}.{os.getpid()}.tmp')
+    tmp_file_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), 'utf-8')
+    tmp_file_path.replace(manifest_file_path)
+    logger.info("Format glyphs: '{}' ({} formatted)", root_dir, len({glyph_file for flavor_group in dirty_context.values() for glyph_file in flavor_group.values()}))
 
 
 def format_mappings():
@@ -0,0 +1,250 @@
+import hashlib
+import os
+import struct
+from collections.abc import Iterator
+from pathlib import Path
+
+from loguru import logger
+from pixel_font_knife import glyph_file_util
+from pixel_font_knife.glyph_file_util import GlyphFile, GlyphFlavorGroup
+from pixel_font_knife.mono_bitmap import MonoBitmap
+
+from tools.configs import path_define
+from tools.configs.options import FontSize
+
+_MAGIC = b'APFGLYPH'
+_VERSION = 1
+
+_header_struct = struct.Struct('<8sIII')
+_bitmap_struct = struct.Struct('<32sHH')
+_path_struct = struct.Struct('<H')
+_entry_struct = struct.Struct('<qQ32s')
+
+_byte_to_pixels = [tuple((byte >> (7 - i)) & 1 for i in range(8)) for byte in range(256)]
+
+type _CacheEntry = tuple[int, int, bytes]
+
+
+class PackedBitmap:
+    @staticmethod
+    def from_mono_bitmap(bitmap: MonoBitmap) -> PackedBitmap:
+        row_size = (bitmap.width + 7) // 8
+        padding = row_size * 8 - bitmap.width
+        data = bytearray()
+        for bitmap_row in bitmap:
+            value = 0
+            for pixel in bitmap_row:
+                value = (value << 1) | (0 if pixel == 0 else 1)
+            data += (value << padding).to_bytes(row_size, 'big')
+        return PackedBitmap(bitmap.width, bitmap.height, bytes(data))
+
+    __slots__ = ('width', 'height', 'data')
+
+    width: int
+    height: int
+    data: bytes
+
+    def __init__(self, width: int, height: int, data: bytes):
+        self.width = width
+        self.height = height
+        self.data = data
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PackedBitmap):
+            return NotImplemented
+        return (self.width == other.width and
+                self.height == other.height and
+                self.data == other.data)
+
+    def __hash__(self) -> int:
+        return hash((self.width, self.height, self.data))
+
+    @property
+    def row_size(self) -> int:
+        return (self.width + 7) // 8
+
+    def to_rows(self) -> list[list[int]]:
+        row_size = self.row_size
+        rows = []
+        for offset in range(0, row_size * self.height, row_size):
+            bitmap_row = []
+            for byte in self.data[offset:offset + row_size]:
+                bitmap_row.extend(_byte_to_pixels[byte])
+            del bitmap_row[self.width:]
+            rows.append(bitmap_row)
+        return rows
+
+    def to_mono_bitmap(self) -> MonoBitmap:
+        bitmap = MonoBitmap()
+        bitmap.width = self.width
+        bitmap.height = self.height
+        bitmap.extend(self.to_rows())
+        return bitmap
+
+
+def _load_cache(file_path: Path) -> tuple[dict[bytes, PackedBitmap], dict[str, _CacheEntry]]:
+    bitmaps = {}
+    entries = {}
+    if not file_path.is_file():
+        return bitmaps, entries
+
+    data = file_path.read_bytes()
+    try:
+        magic, version, bitmaps_count, entries_count = _header_struct.unpack_from(data, 0)
+        if magic != _MAGIC or version != _VERSION:
+            logger.warning("Ignore incompatible glyph cache: '{}'", file_path)
+            return {}, {}
+        offset = _header_struct.size
+
+        for _ in range(bitmaps_count):
+            digest, width, height = _bitmap_struct.unpack_from(data, offset)
+            offset += _bitmap_struct.size
+            size = (width + 7) // 8 * height
+            bitmaps[digest] = PackedBitmap(width, height, data[offset:offset + size])
+            offset += size
+
+        for _ in range(entries_count):
+            path_size, = _path_struct.unpack_from(data, offset)
+            offset += _path_struct.size
+            file_key = data[offset:offset + path_size].decode('utf-8')
+            offset += path_size
+            entries[file_key] = _entry_struct.unpack_from(data, offset)
+            offset += _entry_struct.size
+    except (struct.error, UnicodeDecodeError):
+        logger.warning("Ignore broken glyph cache: '{}'", file_path)
+        return {}, {}
+    return bitmaps, entries
+
+
+def _save_cache(file_path: Path, bitmaps: dict[bytes, PackedBitmap], entries: dict[str, _CacheEntry]):
+    data = bytearray(_header_struct.pack(_MAGIC, _VERSION, len(bitmaps), len(entries)))
+    for digest, bitmap in bitmaps.items():
+        data += _bitmap_struct.pack(digest, bitmap.width, bitmap.height)
+        data += bitmap.data
+    for file_key, (mtime_ns, size, digest) in entries.items():
+        path_data = file_key.encode('utf-8')
+        data += _path_struct.pack(len(path_data))
+        data += path_data
+        data += _entry_struct.pack(mtime_ns, size, digest)
+
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file_path = file_path.with_name(f'{file_path.name}.{os.getpid()}.tmp')
+    tmp_file_path.write_bytes(data)
+    tmp_file_path.replace(file_path)
+
+
+def _iter_glyph_files(context: dict[int, GlyphFlavorGroup]) -> Iterator[GlyphFile]:
+    glyph_files = set()
+    for flavor_group in context.values():
+        for glyph_file in flavor_group.values():
+            if glyph_file not in glyph_files:
+                glyph_files.add(glyph_file)
+                yield glyph_file
+
+
+def _get_root_dir(font_size: FontSize, width_mode_dir_name: str) -> Path:
+    return path_define.glyphs_dir.joinpath(str(font_size), width_mode_dir_name)
+
+
+def _get_cache_file_path(font_size: FontSize, width_mode_dir_name: str) -> Path:
+    return path_define.glyph_caches_dir.joinpath(f'{font_size}px-{width_mode_dir_name}.bin')
+
+
+class GlyphBitmapStore:
+    @staticmethod
+    def load(font_size: FontSize, width_mode_dir_name: str, bitmap_pool: dict[PackedBitmap, PackedBitmap] | None = None) -> GlyphBitmapStore:
+        root_dir = _get_root_dir(font_size, width_mode_dir_name)
+        cache_file_path = _get_cache_file_path(font_size, width_mode_dir_name)
+        context = glyph_file_util.load_context(root_dir)
+        cached_bitmaps, cached_entries = _load_cache(cache_file_path)
+        return GlyphBitmapStore(root_dir, cache_file_path, context, cached_bitmaps, cached_entries, bitmap_pool)
+
+    root_dir: Path
+    cache_file_path: Path
+    context: dict[int, GlyphFlavorGroup]
+    _cached_bitmaps: dict[bytes, PackedBitmap]
+    _entries: dict[str, _CacheEntry]
+    _digests: dict[Path, bytes]
+    _bitmaps: dict[Path, PackedBitmap]
+    _bitmap_pool: dict[PackedBitmap, PackedBitmap]
+    _decoded_count: int
+    _dirty: bool
+
+    def __init__(
+            self,
+            root_dir: Path,
+            cache_file_path: Path,
+            context: dict[int, GlyphFlavorGroup],
+            cached_bitmaps: dict[bytes, PackedBitmap],
+            cached_entries: dict[str, _CacheEntry],
+            bitmap_pool: dict[PackedBitmap, PackedBitmap] | None = None,
+    ):
+        self.root_dir = root_dir
+        self.cache_file_path = cache_file_path
+        self.context = context
+        self._cached_bitmaps = cached_bitmaps
+        self._entries = cached_entries
+        self._digests = {}
+        self._bitmaps = {}
+        self._bitmap_pool = bitmap_pool if bitmap_pool is not None else {}
+        self._decoded_count = 0
+        self._dirty = False
+
+    def get_digest(self, file_path: Path) -> bytes:
+        if file_path in self._digests:
+            return self._digests[file_path]
+
+        file_key = file_path.relative_to(self.root_dir).as_posix()
+        stat = file_path.stat()
+        entry = self._entries.get(file_key)
+        if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            digest = entry[2]
+        else:
+            digest = hashlib.sha256(file_path.read_bytes()).digest()
+            self._entries[file_key] = stat.st_mtime_ns, stat.st_size, digest
+            self._dirty = True
+        self._digests[file_path] = digest
+        return digest
+
+    def get_bitmap(self, file_path: Path) -> PackedBitmap:
+        if file_path in self._bitmaps:
+            return self._bitmaps[file_path]
+
+        digest = self.get_digest(file_path)
+        if digest in self._cached_bitmaps:
+            bitmap = self._cached_bitmaps[digest]
+        else:
+            bitmap = PackedBitmap.from_mono_bitmap(MonoBitmap.load_png(file_path))
+            self._cached_bitmaps[digest] = bitmap
+            self._decoded_count += 1
+            self._dirty = True
+        bitmap = self._bitmap_pool.setdefault(bitmap, bitmap)
+        self._cached_bitmaps[digest] = bitmap
+        self._bitmaps[file_path] = bitmap
+        return bitmap
+
+    def invalidate(self, file_path: Path):
+        self._digests.pop(file_path, None)
+        self._bitmaps.pop(file_path, None)
+
+    def save(self):
+        if not self._dirty:
+            return
+
+        file_keys = {glyph_file.file_path.relative_to(self.root_dir).as_posix() for glyph_file in _iter_glyph_files(self.context)}
+        entries = {file_key: entry for file_key, entry in self._entries.items() if file_key in file_keys}
+        bitmaps = {}
+        for _, _, digest in entries.values():
+            if digest in self._cached_bitmaps:
+                bitmaps[digest] = self._cached_bitmaps[digest]
+        _save_cache(self.cache_file_path, bitmaps, entries)
+        logger.info("Update glyph cache: '{}' ({} decoded)", self.cache_file_path, self._decoded_count)
+        self._decoded_count = 0
+        self._dirty = False
+
+
+def load_packed_context(font_size: FontSize, width_mode_dir_name: str) -> tuple[dict[int, GlyphFlavorGroup], dict[Path, PackedBitmap]]:
+    store = GlyphBitmapStore.load(font_size, width_mode_dir_name)
+    file_bitmaps = {glyph_file.file_path: store.get_bitmap(glyph_file.file_path) for glyph_file in _iter_glyph_files(store.context)}
+    store.save()
+    return store.context, file_bitmaps
@@ -1,4 +1,8 @@
 import math
+import threading
+import weakref
+from io import BytesIO
+from pathlib import Path
 
 from PIL import Image, ImageFont, ImageDraw
 from PIL.ImageFont import FreeTypeFont
@@ -10,9 +14,39 @@ from tools.configs.options import FontSize, WidthMode, LanguageFlavor
 from tools.services.font_service import DesignContext
 
 
+_cache_lock = threading.Lock()
+_font_cache: dict[tuple[Path, int], tuple[tuple[int, int], FreeTypeFont]] = {}
+_image_cache: dict[Path, tuple[tuple[int, int], Image.Image]] = {}
+_glyph_atlases: weakref.WeakKeyDictionary[FreeTypeFont, dict[tuple[str, tuple[float, float]], tuple[Image.Image, tuple[int, int]] | None]] = weakref.WeakKeyDictionary()
+
+
+def _get_file_signature(file_path: Path) -> tuple[int, int]:
+    stat = file_path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
 def _load_font(font_size: FontSize, width_mode: WidthMode, language_flavor: LanguageFlavor, scale: int = 1) -> FreeTypeFont:
     file_path = path_define.outputs_dir.joinpath(f'ark-pixel-{font_size}px-{width_mode}-{language_flavor}.otf.woff2')
-    return ImageFont.truetype(file_path, font_size * scale)
+    key = file_path, font_size * scale
+    signature = _get_file_signature(file_path)
+    with _cache_lock:
+        if key in _font_cache and _font_cache[key][0] == signature:
+            return _font_cache[key][1]
+        font = ImageFont.truetype(BytesIO(file_path.read_bytes()), font_size * scale)
+        _font_cache[key] = signature, font
+    return font
+
+
+def _load_image(file_name: str) -> Image.Image:
+    file_path = path_define.images_dir.joinpath(file_name)
+    signature = _get_file_signature(file_path)
+    with _cache_lock:
+        if file_path in _image_cache and _image_cache[file_path][0] == signature:
+            return _image_cache[file_path][1]
+        image = Image.open(file_path)
+        image.load()
+        _image_cache[file_path] = signature, image
+    return image
 
 
 def _draw_text(
@@ -43,6 +77,15 @@ def _draw_text(
     draw.text((x, y), text, fill=text_color, font=font, spacing=spacing)
 
 
+def _make_glyph_mask(font: FreeTypeFont, c: str, start: tuple[float, float], box_size: int) -> tuple[Image.Image, tuple[int, int]] | None:
+    mask = Image.new('L', (box_size * 3, box_size * 3), 0)
+    ImageDraw.Draw(mask).text((box_size + start[0], box_size + start[1]), c, fill=255, font=font)
+    bbox = mask.getbbox()
+    if bbox is None:
+        return None
+    return mask.crop(bbox), (bbox[0] - box_size, bbox[1] - box_size)
+
+
 def _draw_text_background(
         image: Image.Image,
         alphabet: list[str],
@@ -51,7 +94,6 @@ def _draw_text_background(
         font: FreeTypeFont,
         text_color: tuple[int, int, int, int],
 ):
-    draw = ImageDraw.Draw(image)
     alphabet = [c for c in alphabet if 0x4E00 <= ord(c) <= 0x9FFF]
     if not alphabet:
         alphabet.append('\u3000')
@@ -59,10 +101,23 @@ def _draw_text_background(
     count_y = math.ceil(image.height / box_size)
     offset_x = (image.width - count_x * box_size) / 2 + (box_size - font.size) / 2
     offset_y = (image.height - count_y * box_size) / 2 + (box_size - sum(font.getmetrics())) / 2
+    with _cache_lock:
+        glyph_atlas = _glyph_atlases.setdefault(font, {})
     alphabet_index = 0
     for y in range(count_y):
         for x in range(count_x):
-            draw.text((offset_x + x * box_size, offset_y + y * box_size), alphabet[alphabet_index % len(alphabet)], fill=text_color, font=font)
+            c = alphabet[alphabet_index % len(alphabet)]
+            cell_x = offset_x + x * box_size
+            cell_y = offset_y + y * box_size
+            origin_x = math.floor(cell_x)
+            origin_y = math.floor(cell_y)
+            start = cell_x - origin_x, cell_y - origin_y
+            if (c, start) not in glyph_atlas:
+                glyph_atlas[c, start] = _make_glyph_mask(font, c, start, box_size)
+            glyph_mask = glyph_atlas[c, start]
+            if glyph_mask is not None:
+                mask, (mask_offset_x, mask_offset_y) = glyph_mask
+                image.paste(text_color, (origin_x + mask_offset_x, origin_y + mask_offset_y, origin_x + mask_offset_x + mask.width, origin_y + mask_offset_y + mask.height), mask)
             alphabet_index += step
 
 
@@ -100,7 +155,7 @@ def make_readme_banner(design_contexts: dict[FontSize, DesignContext]):
     text_color = (255, 255, 255, 255)
     shadow_color = (80, 80, 80, 255)
 
-    image_background = Image.open(path_define.images_dir.joinpath('readme-banner-background.png'))
+    image_background = _load_image('readme-banner-background.png')
     image = Image.new('RGBA', (image_background.width, image_background.height), (0, 0, 0, 0))
     _draw_text_background(image, alphabet, 50, box_size, font_x1, (200, 200, 200, 255))
     image.paste(image_background, mask=image_background)
@@ -126,7 +181,7 @@ def make_github_banner(design_contexts: dict[FontSize, DesignContext]):
     text_color = (255, 255, 255, 255)
     shadow_color = (80, 80, 80, 255)
 
-    image_background = Image.open(path_define.images_dir.joinpath('github-banner-background.png'))
+    image_background = _load_image('github-banner-background.png')
     image = Image.new('RGBA', (image_background.width, image_background.height), (0, 0, 0, 0))
     _draw_text_background(image, alphabet, 12, box_size, font_zh_cn, (200, 200, 200, 255))
     image.paste(image_background, mask=image_background)
@@ -156,7 +211,7 @@ def make_itch_io_banner(design_contexts: dict[FontSize, DesignContext]):
     text_color = (255, 255, 255, 255)
     shadow_color = (80, 80, 80, 255)
 
-    image_background = Image.open(path_define.images_dir.joinpath('itch-io-banner-background.png'))
+    image_background = _load_image('itch-io-banner-background.png')
     image = Image.new('RGBA', (image_background.width, image_background.height), (0, 0, 0, 0))
     _draw_text_background(image, alphabet, 38, box_size, font_x1, (200, 200, 200, 255))
     image.paste(image_background, mask=image_background)
@@ -180,7 +235,7 @@ def make_itch_io_cover():
     text_color = (255, 255, 255, 255)
     shadow_color = (80, 80, 80, 255)
 
-    image = Image.open(path_define.images_dir.joinpath('itch-io-cover-background.png'))
+    image = _load_image('itch-io-cover-background.png').copy()
     _draw_text(image, (image.width / 2, 19), '方舟像素字体', font_title, text_color=text_color, shadow_color=shadow_color, is_horizontal_centered=True)
     _draw_text(image, (image.width / 2, 19 + line_height * 2), 'Ark Pixel Font', font_latin, text_color=text_color, shadow_color=shadow_color, is_horizontal_centered=True)
     _draw_text(image, (image.width / 2, 19 + line_height * 4), '我们度过的每个平凡的日常，也许就是连续发生的奇迹。', font_zh_cn, text_color=text_color, shadow_color=shadow_color, is_horizontal_centered=True)
@@ -210,7 +265,7 @@ def make_afdian_cover():
     text_color = (255, 255, 255, 255)
     shadow_color = (80, 80, 80, 255)
 
-    image = Image.open(path_define.images_dir.joinpath('afdian-cover-background.png'))
+    image = _load_image('afdian-cover-background.png').copy()
     _draw_text(image, (image.width / 2, 24), '方舟像素字体', font_title, text_color=text_color, shadow_color=shadow_color, is_horizontal_centered=True)
     _draw_text(image, (image.width / 2, 24 + line_height * 2), 'Ark Pixel Font', font_latin, text_color=text_color, shadow_color=shadow_color, is_horizontal_centered=True)
     _draw_text(image, (image.width / 2, 36 + line_height * 3), '★ 开源的泛中日韩像素字体 ★', font_zh_cn, text_color=text_color, shadow_color=shadow_color, is_horizontal_centered=True)
@@ -1,5 +1,8 @@
+import functools
+import json
+import os
 from collections import defaultdict
-from collections.abc import Callable
+from types import ModuleType
 from typing import TextIO
 
 import unicodedata2
@@ -19,6 +22,37 @@ def _do_we_need_to_create_a_glyph(c: str) -> bool:
     return category.startswith(('L', 'M', 'N', 'P', 'S')) or category == 'Zs'
 
 
+@functools.cache
+def _get_unicode_block_totals() -> dict[int, int]:
+    file_path = path_define.unicode_caches_dir.joinpath(f'blocks-{unidata_blocks.unicode_version}-{unicodedata2.unidata_version}.json')
+    if file_path.is_file():
+        try:
+            return {int(code_start): total for code_start, total in json.loads(file_path.read_bytes()).items()}
+        except ValueError:
+            logger.warning("Ignore broken unicode cache: '{}'", file_path)
+
+    block_totals = {}
+    for block in unidata_blocks.get_blocks():
+        total = 0
+        if 'Private Use Area' not in block.name:
+            for code_point in range(block.code_start, block.code_end + 1):
+                if _do_we_need_to_create_a_glyph(chr(code_point)):
+                    total += 1
+        block_totals[block.code_start] = total
+
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file_path = file_path.with_name(f'{file_path.name}.{os.getpid()}.tmp')
+    tmp_file_path.write_text(json.dumps(block_totals, indent=2), 'utf-8')
+    tmp_file_path.replace(file_path)
+    logger.info("Make unicode cache: '{}'", file_path)
+    return block_totals
+
+
+@functools.cache
+def _get_locale_categories(encoding: ModuleType) -> dict[str, frozenset[str]]:
+    return {category: frozenset(getattr(encoding, f'get_alphabet_{category.replace('-', '_')}')()) for category in encoding.get_categories()}
+
+
 def _get_unicode_chr_count_infos(alphabet: set[str]) -> list[tuple[UnicodeBlock, int, int]]:
     in_block_counts = defaultdict(int)
     for c in alphabet:
@@ -27,31 +61,22 @@ def _get_unicode_chr_count_infos(alphabet: set[str]) -> list[tuple[UnicodeBlock,
             assert _do_we_need_to_create_a_glyph(c)
         in_block_counts[block.code_start] += 1
 
+    block_totals = _get_unicode_block_totals()
     count_infos = []
     for code_start, count in sorted(in_block_counts.items()):
         block = unidata_blocks.get_block_by_code_point(code_start)
-        total = 0
-        if 'Private Use Area' not in block.name:
-            for code_point in range(block.code_start, block.code_end + 1):
-                c = chr(code_point)
-                if _do_we_need_to_create_a_glyph(c):
-                    total += 1
-        count_infos.append((block, count, total))
+        count_infos.append((block, count, block_totals[code_start]))
     return count_infos
 
 
-def _get_locale_chr_count_infos(alphabet: set[str], query_category_func: Callable[[str], str | None]) -> defaultdict[str, int]:
-    count_infos = defaultdict(int)
-    for c in alphabet:
-        category = query_category_func(c)
-        if category is not None:
-            count_infos[category] += 1
-            count_infos['total'] += 1
+def _get_locale_chr_count_infos(alphabet: set[str], encoding: ModuleType) -> dict[str, int]:
+    count_infos = {category: len(alphabet & chars) for category, chars in _get_locale_categories(encoding).items()}
+    count_infos['total'] = sum(count_infos.values())
     return count_infos
 
 
 def _get_gb2312_chr_count_infos(alphabet: set[str]) -> list[tuple[str, int, int]]:
-    count_infos = _get_locale_chr_count_infos(alphabet, gb2312.query_category)
+    count_infos = _get_locale_chr_count_infos(alphabet, gb2312)
     return [
         ('一级汉字', count_infos['level-1'], gb2312.get_level_1_count()),
         ('二级汉字', count_infos['level-2'], gb2312.get_level_2_count()),
@@ -61,7 +86,7 @@ def _get_gb2312_chr_count_infos(alphabet: set[str]) -> list[tuple[str, int, int]
 
 
 def _get_big5_chr_count_infos(alphabet: set[str]) -> list[tuple[str, int, int]]:
-    count_infos = _get_locale_chr_count_infos(alphabet, big5.query_category)
+    count_infos = _get_locale_chr_count_infos(alphabet, big5)
     return [
         ('常用汉字', count_infos['level-1'], big5.get_level_1_count()),
         ('次常用汉字', count_infos['level-2'], big5.get_level_2_count()),
@@ -71,7 +96,7 @@ def _get_big5_chr_count_infos(alphabet: set[str]) -> list[tuple[str, int, int]]:
 
 
 def _get_shiftjis_chr_count_infos(alphabet: set[str]) -> list[tuple[str, int, int]]:
-    count_infos = _get_locale_chr_count_infos(alphabet, shiftjis.query_category)
+    count_infos = _get_locale_chr_count_infos(alphabet, shiftjis)
     return [
         ('单字节-ASCII可打印字符', count_infos['single-byte-ascii-printable'], shiftjis.get_single_byte_ascii_printable_count()),
         ('单字节-半角片假名', count_infos['single-byte-half-width-katakana'], shiftjis.get_single_byte_half_width_katakana_count()),
@@ -82,7 +107,7 @@ def _get_shiftjis_chr_count_infos(alphabet: set[str]) -> list[tuple[str, int, in
 
 
 def _get_ksx1001_chr_count_infos(alphabet: set[str]) -> list[tuple[str, int, int]]:
-    count_infos = _get_locale_chr_count_infos(alphabet, ksx1001.query_category)
+    count_infos = _get_locale_chr_count_infos(alphabet, ksx1001)
     return [
         ('谚文音节', count_infos['syllable'], ksx1001.get_syllable_count()),
         ('汉字', count_infos['hanja'], ksx1001.get_hanja_count()),
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+from collections.abc import Callable
+from importlib import metadata
+from pathlib import Path
+
+from loguru import logger
+from pixel_font_knife.glyph_file_util import GlyphFile, GlyphFlavorGroup
+from pixel_font_knife.kerning_util import KerningConfig
+from pixel_font_knife.mono_bitmap import MonoBitmap
+
+from tools.configs import path_define
+from tools.configs.options import FontSize
+from tools.services.glyph_cache_service import PackedBitmap
+
+_VERSION = 1
+
+type _KerningPair = tuple[str, GlyphFile, GlyphFile]
+
+
+def _get_bitmap_key(bitmap: PackedBitmap) -> str:
+    return hashlib.blake2b(f'{bitmap.width}x{bitmap.height}:'.encode() + bitmap.data, digest_size=8).hexdigest()
+
+
+def _load_cache(file_path: Path) -> dict[str, int]:
+    if not file_path.is_file():
+        return {}
+    try:
+        data = json.loads(file_path.read_bytes())
+    except ValueError:
+        logger.warning("Ignore broken kerning cache: '{}'", file_path)
+        return {}
+    if data.get('version') != _VERSION or data.get('pixel-font-knife') != metadata.version('pixel-font-knife'):
+        logger.warning("Ignore incompatible kerning cache: '{}'", file_path)
+        return {}
+    return data['values']
+
+
+def _save_cache(file_path: Path, values: dict[str, int]):
+    data = json.dumps({
+        'version': _VERSION,
+        'pixel-font-knife': metadata.version('pixel-font-knife'),
+        'values': values,
+    }, indent=2, sort_keys=True)
+
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file_path = file_path.with_name(f'{file_path.name}.{os.getpid()}.tmp')
+    tmp_file_path.write_text(data, 'utf-8')
+    tmp_file_path.replace(file_path)
+
+
+def _calculate_kerning_value(left_bitmap_mask: MonoBitmap, right_bitmap: MonoBitmap, offset: int) -> int:
+    while offset < 0:
+        if not left_bitmap_mask.is_overlapped(right_bitmap, x=left_bitmap_mask.width + offset):
+            break
+        offset += 1
+    return offset
+
+
+def get_kerning_values(
+        font_size: FontSize,
+        kerning_config: KerningConfig,
+        context: dict[int, GlyphFlavorGroup],
+        get_bitmap: Callable[[Path], PackedBitmap],
+) -> dict[tuple[str, str], int]:
+    file_path = path_define.kerning_caches_dir.joinpath(f'{font_size}px.json')
+    cached_values = _load_cache(file_path)
+
+    bitmap_keys = {}
+    pairs: list[_KerningPair] = []
+    values = {}
+    missing_right_alphabets: dict[tuple[int, str], list[str]] = {}
+    missing_pair_keys: dict[tuple[int, str, str], str] = {}
+    for (left_group_name, right_group_name), offset in kerning_config.templates.items():
+        if offset >= 0:
+            continue
+
+        for left_c in kerning_config.groups[left_group_name]:
+            left_code_point = ord(left_c)
+            if left_code_point not in context:
+                continue
+            left_file = context[left_code_point].get_file()
+            if left_file.file_path not in bitmap_keys:
+                bitmap_keys[left_file.file_path] = _get_bitmap_key(get_bitmap(left_file.file_path))
+
+            for right_c in kerning_config.groups[right_group_name]:
+                right_code_point = ord(right_c)
+                if right_code_point not in context:
+                    continue
+                right_file = context[right_code_point].get_file()
+                if right_file.file_path not in bitmap_keys:
+                    bitmap_keys[right_file.file_path] = _get_bitmap_key(get_bitmap(right_file.file_path))
+
+                pair_key = f'{offset}:{bitmap_keys[left_file.file_path]}:{bitmap_keys[right_file.file_path]}'
+                pairs.append((pair_key, left_file, right_file))
+                if pair_key in values:
+                    continue
+                if pair_key in cached_values:
+                    values[pair_key] = cached_values[pair_key]
+                elif (offset, left_c, right_c) not in missing_pair_keys:
+                    missing_right_alphabets.setdefault((offset, left_c), []).append(right_c)
+                    missing_pair_keys[offset, left_c, right_c] = pair_key
+
+    mono_bitmaps = {}
+    for (offset, left_c), right_alphabet in missing_right_alphabets.items():
+        for c in [left_c, *right_alphabet]:
+            glyph_file = context[ord(c)].get_file()
+            if glyph_file.file_path not in mono_bitmaps:
+                mono_bitmaps[glyph_file.file_path] = get_bitmap(glyph_file.file_path).to_mono_bitmap()
+
+        left_bitmap_mask = mono_bitmaps[context[ord(left_c)].get_file().file_path].pixel_expand(1)
+        for right_c in right_alphabet:
+            right_bitmap = mono_bitmaps[context[ord(right_c)].get_file().file_path]
+            values[missing_pair_keys[offset, left_c, right_c]] = _calculate_kerning_value(left_bitmap_mask, right_bitmap, offset)
+
+    if len(missing_pair_keys) > 0 or values.keys() != cached_values.keys():
+        _save_cache(file_path, values)
+        logger.info("Update kerning cache: '{}' ({} calculated)", file_path, len(missing_pair_keys))
+
+    kerning_values = {}
+    for pair_key, left_file, right_file in pairs:
+        value = values[pair_key]
+        if value < 0:
+            kerning_values[(left_file.glyph_name, right_file.glyph_name)] = value
+    return kerning_values
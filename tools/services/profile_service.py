@@ -0,0 +1,168 @@
+import cProfile
+import json
+import os
+import pstats
+import re
+import sys
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from loguru import logger
+
+from tools.configs import path_define
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+_proc_status_file_path = '/proc/self/status'
+_proc_clear_refs_file_path = '/proc/self/clear_refs'
+_regex_vm_hwm = re.compile(r'^VmHWM:\s+(\d+) kB$', re.MULTILINE)
+
+_enabled = False
+_cprofile_enabled = False
+_records: list[dict[str, Any]] = []
+_peak_memory_stack: list[int] = []
+
+
+def enable(cprofile: bool = False):
+    global _enabled, _cprofile_enabled
+    _enabled = True
+    _cprofile_enabled = cprofile
+    _records.clear()
+    _peak_memory_stack.clear()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def is_cprofile_enabled() -> bool:
+    return _cprofile_enabled
+
+
+def _reset_peak_memory():
+    try:
+        with open(_proc_clear_refs_file_path, 'w') as file:
+            file.write('5')
+    except OSError:
+        pass
+
+
+def _get_peak_memory() -> int:
+    try:
+        with open(_proc_status_file_path, 'r') as file:
+            match = _regex_vm_hwm.search(file.read())
+        if match is not None:
+            return int(match.group(1)) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return 0
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+@contextmanager
+def measure(stage: str, cprofile: bool = False, **labels: Any) -> Iterator[None]:
+    if not _enabled:
+        yield
+        return
+
+    profiler = cProfile.Profile() if cprofile and _cprofile_enabled else None
+    _reset_peak_memory()
+    _peak_memory_stack.append(0)
+    wall_time_start = time.perf_counter()
+    cpu_time_start = time.process_time()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        cpu_time = time.process_time() - cpu_time_start
+        wall_time = time.perf_counter() - wall_time_start
+        peak_memory = max(_get_peak_memory(), _peak_memory_stack.pop())
+        if len(_peak_memory_stack) > 0:
+            _peak_memory_stack[-1] = max(_peak_memory_stack[-1], peak_memory)
+        _reset_peak_memory()
+
+        record = {
+            'stage': stage,
+            'labels': labels,
+            'pid': os.getpid(),
+            'wall_time': wall_time,
+            'cpu_time': cpu_time,
+            'peak_memory': peak_memory,
+        }
+        if profiler is not None:
+            path_define.profile_parts_dir.mkdir(parents=True, exist_ok=True)
+            file_path = path_define.profile_parts_dir.joinpath(f'{'-'.join([stage, *map(str, labels.values()), str(os.getpid())])}.prof')
+            profiler.dump_stats(file_path)
+            record['cprofile'] = str(file_path)
+        _records.append(record)
+
+
+def pop_records() -> list[dict[str, Any]]:
+    records = _records.copy()
+    _records.clear()
+    return records
+
+
+def add_records(records: list[dict[str, Any]]):
+    _records.extend(records)
+
+
+def _format_summary_table() -> list[str]:
+    summaries = {}
+    for record in _records:
+        summary = summaries.setdefault(record['stage'], {
+            'count': 0,
+            'wall_time': 0.0,
+            'cpu_time': 0.0,
+            'peak_memory': 0,
+        })
+        summary['count'] += 1
+        summary['wall_time'] += record['wall_time']
+        summary['cpu_time'] += record['cpu_time']
+        summary['peak_memory'] = max(summary['peak_memory'], record['peak_memory'])
+
+    lines = [f'{'stage':<16} {'count':>6} {'wall (s)':>10} {'cpu (s)':>10} {'peak (MB)':>10}']
+    for stage, summary in sorted(summaries.items(), key=lambda item: item[1]['wall_time'], reverse=True):
+        lines.append(f'{stage:<16} {summary['count']:>6} {summary['wall_time']:>10.2f} {summary['cpu_time']:>10.2f} {summary['peak_memory'] / 1024 / 1024:>10.1f}')
+    return lines
+
+
+def _merge_cprofiles():
+    stage_to_file_paths = {}
+    for record in _records:
+        if 'cprofile' in record:
+            stage_to_file_paths.setdefault(record['stage'], []).append(record.pop('cprofile'))
+
+    for stage, part_file_paths in stage_to_file_paths.items():
+        file_path = path_define.profiles_dir.joinpath(f'{stage}.prof')
+        pstats.Stats(*part_file_paths).dump_stats(file_path)
+        logger.info("Make cprofile: '{}' ({} parts)", file_path, len(part_file_paths))
+        for part_file_path in part_file_paths:
+            os.remove(part_file_path)
+
+
+def save_report():
+    if not _enabled:
+        return
+
+    _merge_cprofiles()
+
+    path_define.build_dir.mkdir(parents=True, exist_ok=True)
+    summary_lines = _format_summary_table()
+
+    file_path = path_define.build_dir.joinpath('profile.json')
+    file_path.write_text(json.dumps({
+        'records': _records,
+        'summary': summary_lines,
+    }, indent=2, ensure_ascii=False), 'utf-8')
+    logger.info("Make profile: '{}'\n{}", file_path, '\n'.join(summary_lines))
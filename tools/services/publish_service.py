@@ -1,25 +1,70 @@
 import re
-from zipfile import ZipFile
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from zipfile import ZipFile, ZipInfo
 
 from loguru import logger
 
 from tools import configs
 from tools.configs import path_define, options
-from tools.configs.options import FontSize, WidthMode, FontFormat
+from tools.configs.options import FontSize, WidthMode, LanguageFlavor, FontFormat
 
 
-def make_release_zips(font_size: FontSize, width_mode: WidthMode, font_formats: list[FontFormat]):
-    path_define.releases_dir.mkdir(parents=True, exist_ok=True)
+class ReleaseZipPacker:
+    font_size: FontSize
+    width_mode: WidthMode
+    _zip_files: dict[FontFormat, ZipFile]
+    _pending_font_datas: dict[LanguageFlavor, dict[FontFormat, bytes]]
+    _next_flavor_index: int
+    _lock: Lock
+    _executor: ThreadPoolExecutor
+    _futures: list[Future]
 
-    for font_format in font_formats:
-        file_path = path_define.releases_dir.joinpath(f'ark-pixel-font-{font_size}px-{width_mode}-{font_format}-v{configs.version}.zip')
-        with ZipFile(file_path, 'w') as file:
-            file.write(path_define.project_root_dir.joinpath('LICENSE-OFL'), 'OFL.txt')
+    def __init__(self, font_size: FontSize, width_mode: WidthMode, font_formats: list[FontFormat]):
+        path_define.releases_dir.mkdir(parents=True, exist_ok=True)
 
-            for language_flavor in options.language_flavors:
-                font_file_name = f'ark-pixel-{font_size}px-{width_mode}-{language_flavor}.{font_format}'
-                file.write(path_define.outputs_dir.joinpath(font_file_name), font_file_name)
-        logger.info("Make release zip: '{}'", file_path)
+        self.font_size = font_size
+        self.width_mode = width_mode
+        self._zip_files = {}
+        for font_format in font_formats:
+            if font_format in options.extra_font_formats:
+                continue
+            file_path = path_define.releases_dir.joinpath(f'ark-pixel-font-{font_size}px-{width_mode}-{font_format}-v{configs.version}.zip')
+            zip_file = ZipFile(file_path, 'w')
+            zip_file.write(path_define.project_root_dir.joinpath('LICENSE-OFL'), 'OFL.txt')
+            self._zip_files[font_format] = zip_file
+        self._pending_font_datas = {}
+        self._next_flavor_index = 0
+        self._lock = Lock()
+        self._executor = ThreadPoolExecutor(1)
+        self._futures = []
+
+    def add_fonts(self, language_flavor: LanguageFlavor, font_datas: dict[FontFormat, bytes]):
+        with self._lock:
+            self._pending_font_datas[language_flavor] = font_datas
+            while self._next_flavor_index < len(options.language_flavors):
+                next_language_flavor = options.language_flavors[self._next_flavor_index]
+                if next_language_flavor not in self._pending_font_datas:
+                    break
+                self._futures.append(self._executor.submit(self._write_fonts, next_language_flavor, self._pending_font_datas.pop(next_language_flavor)))
+                self._next_flavor_index += 1
+
+    def _write_fonts(self, language_flavor: LanguageFlavor, font_datas: dict[FontFormat, bytes]):
+        date_time = time.localtime()[:6]
+        for font_format, zip_file in self._zip_files.items():
+            zip_info = ZipInfo(f'ark-pixel-{self.font_size}px-{self.width_mode}-{language_flavor}.{font_format}', date_time)
+            zip_info.external_attr = 0o100644 << 16
+            zip_file.writestr(zip_info, font_datas[font_format])
+
+    def close(self):
+        self._executor.shutdown()
+        for future in self._futures:
+            future.result()
+        assert self._next_flavor_index == len(options.language_flavors), f'missing fonts: {self.font_size}px {self.width_mode}'
+        for zip_file in self._zip_files.values():
+            zip_file.close()
+            logger.info("Make release zip: '{}'", zip_file.filename)
 
 
 def update_docs():
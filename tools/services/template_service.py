@@ -1,5 +1,9 @@
+import functools
+import html
+from collections.abc import Iterator
+
 import bs4
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
 from loguru import logger
 
 from tools import configs
@@ -7,98 +11,115 @@ from tools.configs import path_define, options
 from tools.configs.options import WidthMode
 from tools.services.font_service import DesignContext
 
+_alphabet_chunk_size = 4096
+
 _environment = Environment(
     trim_blocks=True,
     lstrip_blocks=True,
     loader=FileSystemLoader(path_define.templates_dir),
+    bytecode_cache=FileSystemBytecodeCache(str(path_define.template_caches_dir)),
+    auto_reload=False,
 )
 
 
 def _make_html(template_name: str, file_name: str, params: dict[str, object] | None = None):
-    params = params.copy() if params is not None else {}
-    params['font_configs'] = configs.font_configs
-    params['width_modes'] = options.width_modes
-    params['locale_to_language_flavor'] = configs.locale_to_language_flavor
-
-    html = _environment.get_template(template_name).render(params)
+    path_define.template_caches_dir.mkdir(parents=True, exist_ok=True)
+    template = _environment.get_template(template_name)
 
     path_define.outputs_dir.mkdir(parents=True, exist_ok=True)
     file_path = path_define.outputs_dir.joinpath(file_name)
-    file_path.write_text(html, 'utf-8')
+    with file_path.open('w', encoding='utf-8') as file:
+        file.writelines(template.generate({
+            'font_configs': configs.font_configs,
+            'width_modes': options.width_modes,
+            'locale_to_language_flavor': configs.locale_to_language_flavor,
+            **(params or {}),
+        }))
     logger.info("Make html: '{}'", file_path)
 
 
+def _iter_alphabet_chunks(alphabet: list[str]) -> Iterator[str]:
+    for start in range(0, len(alphabet), _alphabet_chunk_size):
+        yield ''.join(alphabet[start:start + _alphabet_chunk_size])
+
+
 def make_alphabet_html(design_context: DesignContext, width_mode: WidthMode):
     _make_html('alphabet.html', f'alphabet-{design_context.font_size}px-{width_mode}.html', {
         'font_config': configs.font_configs[design_context.font_size],
         'width_mode': width_mode,
-        'alphabet': ''.join(sorted(c for c in design_context.get_alphabet(width_mode) if ord(c) >= 128)),
+        'alphabet_chunks': _iter_alphabet_chunks(sorted(c for c in design_context.get_alphabet(width_mode) if ord(c) >= 128)),
     })
 
 
-def _handle_demo_html_element(design_context: DesignContext, soup: bs4.BeautifulSoup, element: bs4.PageElement):
-    if isinstance(element, bs4.element.Tag):
-        for child_element in element.contents:
-            _handle_demo_html_element(design_context, soup, child_element)
-    elif isinstance(element, bs4.element.NavigableString):
-        alphabet_monospaced = design_context.get_alphabet('monospaced')
-        alphabet_proportional = design_context.get_alphabet('proportional')
-        text = str(element)
-        tmp_parent = soup.new_tag('div')
-        last_status = None
-        text_buffer = ''
-        for c in text:
-            if c == ' ':
-                status = last_status
-            elif c == '\n':
-                status = 'all'
-            elif c in alphabet_monospaced and c in alphabet_proportional:
-                status = 'all'
-            elif c in alphabet_monospaced:
-                status = 'monospaced'
-            elif c in alphabet_proportional:
-                status = 'proportional'
-            else:
-                status = None
-            if last_status != status:
-                if text_buffer != '':
-                    if last_status == 'all':
-                        tmp_child = bs4.element.NavigableString(text_buffer)
-                    else:
-                        tmp_child = soup.new_tag('span')
-                        tmp_child.string = text_buffer
-                        if last_status == 'monospaced':
-                            tmp_child['class'] = f'char-notdef-proportional'
-                        elif last_status == 'proportional':
-                            tmp_child['class'] = f'char-notdef-monospaced'
-                        else:
-                            tmp_child['class'] = f'char-notdef-monospaced char-notdef-proportional'
-                    tmp_parent.append(tmp_child)
-                    text_buffer = ''
-                last_status = status
-            text_buffer += c
-        if text_buffer != '':
-            if last_status == 'all':
-                tmp_child = bs4.element.NavigableString(text_buffer)
-            else:
-                tmp_child = soup.new_tag('span')
-                tmp_child.string = text_buffer
-                if last_status == 'monospaced':
-                    tmp_child['class'] = f'char-notdef-proportional'
-                elif last_status == 'proportional':
-                    tmp_child['class'] = f'char-notdef-monospaced'
-                else:
-                    tmp_child['class'] = f'char-notdef-monospaced char-notdef-proportional'
-            tmp_parent.append(tmp_child)
-        element.replace_with(tmp_parent)
-        tmp_parent.unwrap()
+_demo_coverage_class_names = {
+    'monospaced': 'char-notdef-proportional',
+    'proportional': 'char-notdef-monospaced',
+    None: 'char-notdef-monospaced char-notdef-proportional',
+}
 
 
-def make_demo_html(design_context: DesignContext):
+@functools.cache
+def _load_demo_content() -> tuple[list[str], list[str]]:
     content_html = path_define.templates_dir.joinpath('demo-content.html').read_text('utf-8')
     soup = bs4.BeautifulSoup(content_html, 'html.parser')
-    _handle_demo_html_element(design_context, soup, soup)
-    content_html = str(soup).strip()
+    texts = []
+    for element in soup.find_all(string=True):
+        texts.append(str(element))
+        element.replace_with('\0')
+    fragments = str(soup).split('\0')
+    return fragments, texts
+
+
+def _get_demo_coverage_statuses(design_context: DesignContext, texts: list[str]) -> dict[str, str | None]:
+    alphabet_monospaced = design_context.get_alphabet('monospaced')
+    alphabet_proportional = design_context.get_alphabet('proportional')
+    statuses = {}
+    for c in set().union(*texts):
+        if c in alphabet_monospaced and c in alphabet_proportional:
+            status = 'all'
+        elif c in alphabet_monospaced:
+            status = 'monospaced'
+        elif c in alphabet_proportional:
+            status = 'proportional'
+        else:
+            status = None
+        statuses[c] = status
+    statuses['\n'] = 'all'
+    return statuses
+
+
+def _annotate_demo_text(text: str, statuses: dict[str, str | None]) -> str:
+    runs = []
+    last_status = None
+    run_start = 0
+    for i, c in enumerate(text):
+        status = last_status if c == ' ' else statuses[c]
+        if last_status != status:
+            if i > run_start:
+                runs.append((text[run_start:i], last_status))
+            run_start = i
+            last_status = status
+    if len(text) > run_start:
+        runs.append((text[run_start:], last_status))
+
+    annotated_text = []
+    for run_text, status in runs:
+        run_text = html.escape(run_text, quote=False)
+        if status == 'all':
+            annotated_text.append(run_text)
+        else:
+            annotated_text.append(f'<span class="{_demo_coverage_class_names[status]}">{run_text}</span>')
+    return ''.join(annotated_text)
+
+
+def make_demo_html(design_context: DesignContext):
+    fragments, texts = _load_demo_content()
+    statuses = _get_demo_coverage_statuses(design_context, texts)
+    content_html = [fragments[0]]
+    for text, fragment in zip(texts, fragments[1:]):
+        content_html.append(_annotate_demo_text(text, statuses))
+        content_html.append(fragment)
+    content_html = ''.join(content_html).strip()
 
     _make_html('demo.html', f'demo-{design_context.font_size}px.html', {
         'font_config': configs.font_configs[design_context.font_size],
@@ -0,0 +1,102 @@
+import importlib
+from pathlib import Path
+
+from loguru import logger
+
+from tools import configs
+from tools.configs import path_define, options
+from tools.configs.options import FontSize, WidthMode, FontFormat, Attachment
+from tools.services import info_service, template_service, image_service
+from tools.services.font_service import DesignContext
+
+type FileSnapshot = dict[Path, tuple[int, int]]
+
+
+def scan_files(font_sizes: list[FontSize]) -> FileSnapshot:
+    root_dirs = [path_define.glyphs_dir.joinpath(str(font_size)) for font_size in font_sizes]
+    root_dirs.extend([path_define.configs_dir, path_define.mappings_dir, path_define.kernings_dir])
+
+    snapshot = {}
+    for root_dir in root_dirs:
+        for dir_path, _, file_names in root_dir.walk():
+            for file_name in file_names:
+                if file_name.startswith('.'):
+                    continue
+                file_path = dir_path.joinpath(file_name)
+                try:
+                    stat = file_path.stat()
+                except FileNotFoundError:
+                    continue
+                snapshot[file_path] = stat.st_mtime_ns, stat.st_size
+    return snapshot
+
+
+def get_changed_file_paths(old_snapshot: FileSnapshot, new_snapshot: FileSnapshot) -> set[Path]:
+    return {file_path for file_path in old_snapshot.keys() | new_snapshot.keys() if old_snapshot.get(file_path) != new_snapshot.get(file_path)}
+
+
+def _make_attachments(design_context: DesignContext, width_modes: list[WidthMode], attachments: list[Attachment]):
+    for width_mode in width_modes:
+        if 'info' in attachments:
+            info_service.make_info(design_context, width_mode)
+        if 'alphabet' in attachments:
+            info_service.make_alphabet_txt(design_context, width_mode)
+        if 'bundle' in attachments:
+            design_context.make_glyph_bundle(width_mode)
+        if 'html' in attachments:
+            template_service.make_alphabet_html(design_context, width_mode)
+    if 'html' in attachments:
+        template_service.make_demo_html(design_context)
+
+
+def _make_preview_image(font_size: FontSize, width_modes: list[WidthMode], font_formats: list[FontFormat], attachments: list[Attachment]):
+    if 'image' in attachments and 'proportional' in width_modes and 'otf.woff2' in font_formats:
+        image_service.make_preview_image(font_size)
+
+
+def build(design_context: DesignContext, width_modes: list[WidthMode], font_formats: list[FontFormat], attachments: list[Attachment]):
+    for width_mode in width_modes:
+        design_context.make_fonts(width_mode, font_formats, web_fonts='html' in attachments)
+    _make_attachments(design_context, width_modes, attachments)
+    _make_preview_image(design_context.font_size, width_modes, font_formats, attachments)
+
+
+def rebuild(
+        design_contexts: dict[FontSize, DesignContext],
+        file_paths: set[Path],
+        width_modes: list[WidthMode],
+        font_formats: list[FontFormat],
+        attachments: list[Attachment],
+):
+    for file_path in sorted(file_paths):
+        logger.info("Changed file: '{}'", file_path)
+
+    if any(not file_path.is_relative_to(path_define.glyphs_dir) for file_path in file_paths):
+        importlib.reload(configs)
+        reload_font_sizes = list(design_contexts)
+    else:
+        reload_font_sizes = []
+
+    for font_size, design_context in design_contexts.items():
+        glyph_file_paths = {file_path for file_path in file_paths if file_path.is_relative_to(path_define.glyphs_dir.joinpath(str(font_size)))}
+        if font_size not in reload_font_sizes:
+            if len(glyph_file_paths) == 0:
+                continue
+            affected_language_flavors = design_context.update_glyph_bitmaps(glyph_file_paths)
+            if affected_language_flavors is not None:
+                for width_mode in width_modes:
+                    language_flavors = affected_language_flavors.get(width_mode, set())
+                    for language_flavor in options.language_flavors:
+                        if language_flavor in language_flavors:
+                            design_context.make_font(width_mode, language_flavor, font_formats)
+                            if 'html' in attachments:
+                                design_context.make_web_fonts(width_mode, language_flavor)
+                    if 'bundle' in attachments and len(language_flavors) > 0:
+                        design_context.make_glyph_bundle(width_mode)
+                if 'proportional' in width_modes and len(affected_language_flavors.get('proportional', set())) > 0:
+                    _make_preview_image(font_size, width_modes, font_formats, attachments)
+                continue
+
+        design_context = DesignContext.load(font_size)
+        design_contexts[font_size] = design_context
+        build(design_context, width_modes, font_formats, attachments)
@@ -0,0 +1,86 @@
+import time
+
+from cyclopts import App, Parameter
+from loguru import logger
+
+from tools import configs
+from tools.configs import options
+from tools.configs.options import FontSize, WidthMode, FontFormat, Attachment
+from tools.services import watch_service
+from tools.services.font_service import DesignContext
+
+app = App(
+    version=configs.version,
+    default_parameter=Parameter(consume_multiple=True),
+)
+
+
+@app.default
+def main(
+        font_sizes: set[FontSize] | None = None,
+        width_modes: set[WidthMode] | None = None,
+        font_formats: set[FontFormat] | None = None,
+        attachments: set[Attachment] | None = None,
+        interval: float = 0.5,
+):
+    if font_sizes is None:
+        font_sizes = options.font_sizes
+    else:
+        font_sizes = sorted(font_sizes, key=lambda x: options.font_sizes.index(x))
+    if width_modes is None:
+        width_modes = options.width_modes
+    else:
+        width_modes = sorted(width_modes, key=lambda x: options.width_modes.index(x))
+    if font_formats is None:
+        font_formats = options.default_font_formats
+    else:
+        font_formats = sorted(font_formats, key=lambda x: options.font_formats.index(x))
+    if attachments is None:
+        attachments = []
+    else:
+        attachments = sorted(attachments, key=lambda x: options.attachments.index(x))
+
+    logger.info('font_sizes = {}', font_sizes)
+    logger.info('width_modes = {}', width_modes)
+    logger.info('font_formats = {}', font_formats)
+    logger.info('attachments = {}', attachments)
+    logger.info('interval = {}', interval)
+
+    snapshot = watch_service.scan_files(font_sizes)
+    design_contexts = {}
+    for font_size in font_sizes:
+        design_context = DesignContext.load(font_size)
+        design_contexts[font_size] = design_context
+        watch_service.build(design_context, width_modes, font_formats, attachments)
+
+    logger.info('Watching for changes, press Ctrl+C to stop')
+    while True:
+        time.sleep(interval)
+        new_snapshot = watch_service.scan_files(font_sizes)
+        changed_file_paths = watch_service.get_changed_file_paths(snapshot, new_snapshot)
+        if len(changed_file_paths) == 0:
+            continue
+
+        while True:
+            snapshot = new_snapshot
+            time.sleep(interval)
+            new_snapshot = watch_service.scan_files(font_sizes)
+            more_changed_file_paths = watch_service.get_changed_file_paths(snapshot, new_snapshot)
+            if len(more_changed_file_paths) == 0:
+                break
+            changed_file_paths.update(more_changed_file_paths)
+
+        start_time = time.perf_counter()
+        try:
+            watch_service.rebuild(design_contexts, changed_file_paths, width_modes, font_formats, attachments)
+        except Exception:
+            logger.exception('Rebuild failed')
+            continue
+        logger.info('Rebuild finished in {:.2f}s', time.perf_counter() - start_time)
+
+
+if __name__ == '__main__':
+    try:
+        app()
+    except KeyboardInterrupt:
+        pass